@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark harness for the documentation sync scripts
+Usage: python benchmark-sync.py [--tags=60] [--minor-lines=12] [--files-per-dir=40] [--file-size=4096]
+       [--target=NAME ...] [--runs=1] [--output=results.json] [--compare=baseline.json]
+       python benchmark-sync.py --tag-parsing=100000 [--minor-lines=12]
+
+This script:
+1. Generates a local git repository with a configurable number of tags, minor
+   lines, doc files per directory and file sizes (offline, via git fast-import)
+2. Runs each sync target against it in a scratch site directory, first cold
+   (empty _docs) and then warm (re-run on the synced output)
+3. Reports wall time, peak RSS, subprocesses spawned and bytes written
+4. Stores the results as JSON and optionally compares them against a baseline
+
+With --tag-parsing it instead times tag parsing and minor-line selection of both
+scripts on a synthetic list of tag names, without generating a repository.
+"""
+
+import sys
+import os
+import shutil
+import subprocess
+import tempfile
+import random
+import json
+import time
+import platform
+import importlib.util
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Optional
+import argparse
+
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+
+DOC_DIRS = ["contributor", "spec", "stdlib", "user-manual"]
+
+# Sync targets to benchmark; add new engines here
+TARGETS = {
+    "sync-docs": [sys.executable, str(SCRIPT_DIR / "sync-docs.py"), "{repo}"],
+    "optimized": [sys.executable, str(SCRIPT_DIR / "sync-docs-optimized.py"), "{repo}",
+                  "--max-versions={minor_lines}"],
+    "optimized-async": [sys.executable, str(SCRIPT_DIR / "sync-docs-optimized.py"), "{repo}",
+                        "--max-versions={minor_lines}", "--engine=async"],
+    "optimized-subprocess": [sys.executable, str(SCRIPT_DIR / "sync-docs-optimized.py"), "{repo}",
+                             "--max-versions={minor_lines}", "--git-backend=subprocess"],
+    # Blobless mirror kept inside the site dir, so "warm" measures an incremental fetch
+    "optimized-mirror": [sys.executable, str(SCRIPT_DIR / "sync-docs-optimized.py"), "{site}/mirror.git",
+                         "--source=file://{repo}", "--max-versions={minor_lines}"],
+}
+
+# Commands counted as spawned subprocesses
+COUNTED_COMMANDS = ["git", "tar", "date"]
+
+
+def make_content(rng: random.Random, size: int, label: str) -> bytes:
+    """Generate a Markdown-looking file of roughly the given size."""
+    words = ["asthra", "type", "memory", "safe", "module", "function", "result", "error",
+             "package", "compile", "runtime", "value", "pointer", "slice", "struct"]
+    lines = [f"# {label}", ""]
+    length = len(lines[0]) + 2
+    while length < size:
+        line = " ".join(rng.choice(words) for _ in range(12))
+        lines.append(line)
+        length += len(line) + 1
+    return ("\n".join(lines) + "\n").encode()
+
+
+def generate_repository(repo_path: Path, tags: int, minor_lines: int, files_per_dir: int,
+                        file_size: int, change_ratio: float, seed: int) -> Dict:
+    """Build a synthetic asthra-like repository with many version tags."""
+    rng = random.Random(seed)
+    repo_path.mkdir(parents=True)
+    subprocess.run(["git", "init", "-q", "-b", "main", str(repo_path)], check=True)
+    # Partial clones of a file:// URL need filtering enabled on the serving side
+    subprocess.run(["git", "-C", str(repo_path), "config", "uploadpack.allowFilter", "true"], check=True)
+
+    files = {
+        f"docs/{dir_name}/page-{i:04d}.md": make_content(rng, file_size, f"{dir_name} page {i}")
+        for dir_name in DOC_DIRS
+        for i in range(files_per_dir)
+    }
+    files["src/main.c"] = b"int main(void) { return 0; }\n"
+
+    patches_per_minor = max(tags // minor_lines, 1)
+    stream = []
+    mark = 0
+    timestamp = 1700000000
+
+    def commit(message: str, changed: Dict[str, bytes], parent: Optional[int]) -> int:
+        nonlocal mark, timestamp
+        mark += 1
+        timestamp += 60
+        stream.append(b"commit refs/heads/main\n")
+        stream.append(f"mark :{mark}\n".encode())
+        stream.append(f"committer Bench <bench@example.com> {timestamp} +0000\n".encode())
+        encoded = message.encode()
+        stream.append(f"data {len(encoded)}\n".encode() + encoded + b"\n")
+        if parent is not None:
+            stream.append(f"from :{parent}\n".encode())
+        for path, content in changed.items():
+            stream.append(f"M 100644 inline {path}\n".encode())
+            stream.append(f"data {len(content)}\n".encode() + content + b"\n")
+        return mark
+
+    head = commit("Initial import", files, None)
+    tag_count = 0
+    for minor in range(minor_lines):
+        for patch in range(patches_per_minor):
+            # Each release rewrites a fraction of the doc pages
+            doc_paths = [path for path in files if path.startswith("docs/")]
+            changed = {
+                path: make_content(rng, file_size, f"{path} at 0.{minor}.{patch}")
+                for path in rng.sample(doc_paths, max(int(len(doc_paths) * change_ratio), 1))
+            }
+            files.update(changed)
+            head = commit(f"Release 0.{minor}.{patch}", changed, head)
+            stream.append(f"reset refs/tags/v0.{minor}.{patch}\nfrom :{head}\n\n".encode())
+            tag_count += 1
+        # A pre-release per minor line exercises tag filtering
+        stream.append(f"reset refs/tags/v0.{minor + 1}.0-rc.1\nfrom :{head}\n\n".encode())
+        tag_count += 1
+
+    subprocess.run(["git", "fast-import", "--quiet"], cwd=repo_path, input=b"".join(stream), check=True)
+    subprocess.run(["git", "checkout", "-q", "-f", "main"], cwd=repo_path, check=True)
+
+    return {"tags": tag_count, "releases": minor_lines * patches_per_minor, "minor_lines": minor_lines}
+
+
+def make_spawn_shims(shim_dir: Path, log_path: Path) -> Dict[str, str]:
+    """Put logging wrappers for counted commands first on PATH."""
+    shim_dir.mkdir(parents=True)
+    for command in COUNTED_COMMANDS:
+        real = shutil.which(command)
+        if not real:
+            continue
+        shim = shim_dir / command
+        shim.write_text(f'#!/bin/sh\necho {command} >> "{log_path}"\nexec "{real}" "$@"\n')
+        shim.chmod(0o755)
+    env = dict(os.environ)
+    env["PATH"] = f"{shim_dir}{os.pathsep}{env.get('PATH', '')}"
+    return env
+
+
+def snapshot_files(root: Path) -> Dict[tuple, tuple]:
+    """Map each distinct file (inode) under root to its (mtime_ns, size)."""
+    files = {}
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            stat = os.lstat(os.path.join(dirpath, filename))
+            files[(stat.st_dev, stat.st_ino)] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+
+def count_written_bytes(before: Dict[tuple, tuple], after: Dict[tuple, tuple]) -> int:
+    """Sum the sizes of files that are new or rewritten between two snapshots."""
+    return sum(
+        size for inode, (mtime, size) in after.items()
+        if before.get(inode, (None, None))[0] != mtime
+    )
+
+
+def run_target(command: List[str], site_dir: Path, env: Dict[str, str], log_path: Path) -> Dict:
+    """Run one sync command and collect its metrics."""
+    log_path.write_text("")
+    output_path = site_dir / ".bench-output.txt"
+    before = snapshot_files(site_dir / "_docs")
+    start = time.perf_counter()
+
+    with open(output_path, 'w') as output:
+        process = subprocess.Popen(command, cwd=site_dir, env=env, stdout=output, stderr=subprocess.STDOUT)
+        _, status, usage = os.wait4(process.pid, 0)
+
+    wall_time = time.perf_counter() - start
+    process.returncode = os.waitstatus_to_exitcode(status)
+
+    spawned = {command_name: 0 for command_name in COUNTED_COMMANDS}
+    for line in log_path.read_text().split('\n'):
+        if line in spawned:
+            spawned[line] += 1
+
+    result = {
+        "exit_code": process.returncode,
+        "wall_time_s": round(wall_time, 4),
+        # Largest RSS of the sync process or any descendant it waited for (KiB on Linux)
+        "peak_rss_kb": usage.ru_maxrss,
+        "subprocesses": spawned,
+        "subprocesses_total": sum(spawned.values()),
+        "bytes_written": count_written_bytes(before, snapshot_files(site_dir / "_docs")),
+    }
+
+    if process.returncode != 0:
+        tail = output_path.read_text().strip().split('\n')[-10:]
+        print(f"⚠ Warning: {' '.join(command)} exited with {process.returncode}")
+        for line in tail:
+            print(f"    {line}")
+
+    return result
+
+
+def make_site(site_dir: Path):
+    """Create a scratch site directory with the docs index the sync updates."""
+    (site_dir / "_docs").mkdir(parents=True)
+    index = SCRIPT_DIR / "_docs" / "index.md"
+    if index.exists():
+        shutil.copyfile(index, site_dir / "_docs" / "index.md")
+
+
+def load_script(name: str):
+    """Import one of the hyphen-named sync scripts as a module."""
+    spec = importlib.util.spec_from_file_location(name.replace("-", "_"), SCRIPT_DIR / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def generate_tag_names(count: int, seed: int) -> List[str]:
+    """Generate a realistic mix of release, pre-release, build and unrelated tag names."""
+    rng = random.Random(seed)
+    tags = []
+    for i in range(count):
+        major, minor, patch = rng.randrange(3), rng.randrange(200), rng.randrange(50)
+        roll = rng.random()
+        if roll < 0.90:
+            tags.append(f"v{major}.{minor}.{patch}")
+        elif roll < 0.95:
+            tags.append(f"v{major}.{minor}.{patch}-rc.{rng.randrange(5)}")
+        elif roll < 0.97:
+            tags.append(f"v{major}.{minor}.{patch}+build.{i}")
+        else:
+            tags.append(f"release-candidate-{i}")
+    # for-each-ref --sort=-version:refname hands tags over newest first
+    return sorted(tags, key=version_sort_key, reverse=True)
+
+
+def version_sort_key(tag: str) -> List:
+    """Approximate git's version sort by comparing digit runs numerically."""
+    return [(0, int(part), "") if part.isdigit() else (1, 0, part) for part in re.split(r"(\d+)", tag)]
+
+
+def benchmark_tag_parsing(count: int, max_versions: int, seed: int, runs: int) -> List[Dict]:
+    """Time tag parsing and minor-line selection of both scripts on synthetic tag names."""
+    tags = generate_tag_names(count, seed)
+    results = []
+
+    optimized = load_script("sync-docs-optimized")
+    syncer = optimized.OptimizedDocSync(Path("."), max_versions=max_versions)
+    baseline = load_script("sync-docs")
+
+    def select_baseline():
+        minor_versions = baseline.group_by_minor_version(baseline.parse_version_tags(tags))
+        return sorted(minor_versions.items(), key=lambda x: minor_versions[x[0]], reverse=True)[:max_versions]
+
+    def select_streamed():
+        # Same consumer as the for-each-ref stream, fed from memory
+        selected = syncer.select_streamed_versions((tag, "") for tag in tags)
+        return {f"{major}.{minor}": entry[0] for (major, minor), entry in selected.items()}
+
+    candidates = {
+        "tag-selection:optimized-streaming": select_streamed,
+        "tag-selection:sync-docs": select_baseline,
+    }
+    for target, select in candidates.items():
+        best = None
+        for _ in range(runs):
+            start = time.perf_counter()
+            selected = select()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        results.append({
+            "target": target,
+            "scenario": f"{count}-tags",
+            "wall_time_s": round(best, 6),
+            "selected": [str(key) for key in (selected if isinstance(selected, dict) else dict(selected))],
+        })
+    return results
+
+
+def compare_results(results: Dict, baseline_path: Path, threshold: float) -> List[str]:
+    """List regressions in wall time or subprocess count against a baseline file."""
+    with open(baseline_path, 'r') as f:
+        baseline = json.load(f)
+
+    previous = {(r["target"], r["scenario"]): r for r in baseline.get("results", [])}
+    regressions = []
+    for result in results["results"]:
+        before = previous.get((result["target"], result["scenario"]))
+        if not before:
+            continue
+        for metric in ("wall_time_s", "peak_rss_kb", "subprocesses_total", "bytes_written"):
+            old, new = before.get(metric), result.get(metric)
+            if old and new is not None and new > old * (1 + threshold):
+                regressions.append(
+                    f"{result['target']} ({result['scenario']}): {metric} {old} -> {new}"
+                )
+    return regressions
+
+
+def report(results: Dict, args):
+    """Write results JSON and check them against the baseline, if requested."""
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"✓ Results written to {args.output}")
+
+    if args.compare:
+        regressions = compare_results(results, Path(args.compare), args.threshold)
+        if regressions:
+            print(f"\n✗ {len(regressions)} regressions against {args.compare}:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            sys.exit(1)
+        print(f"✓ No regressions against {args.compare}")
+
+
+def run_tag_parsing_benchmark(args):
+    print(f"Benchmarking tag selection on {args.tag_parsing} tags...")
+    results = {
+        "created": datetime.now().astimezone().isoformat(),
+        "python": platform.python_version(),
+        "config": {"tag_parsing": args.tag_parsing, "max_versions": args.minor_lines,
+                   "seed": args.seed, "runs": args.runs},
+        "results": benchmark_tag_parsing(args.tag_parsing, args.minor_lines, args.seed, max(args.runs, 3)),
+    }
+    for result in results["results"]:
+        print(f"✓ {result['target']:<26} {result['wall_time_s'] * 1000:>9.2f} ms")
+    report(results, args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the documentation sync scripts")
+    parser.add_argument("--tags", type=int, default=60,
+                       help="Number of release tags to generate (default: 60)")
+    parser.add_argument("--minor-lines", type=int, default=12,
+                       help="Number of minor version lines (default: 12)")
+    parser.add_argument("--files-per-dir", type=int, default=40,
+                       help="Doc files per documentation directory (default: 40)")
+    parser.add_argument("--file-size", type=int, default=4096,
+                       help="Approximate size of each doc file in bytes (default: 4096)")
+    parser.add_argument("--change-ratio", type=float, default=0.1,
+                       help="Fraction of doc files changed per release (default: 0.1)")
+    parser.add_argument("--seed", type=int, default=1,
+                       help="Random seed for the generated repository (default: 1)")
+    parser.add_argument("--target", action="append", choices=sorted(TARGETS),
+                       help="Sync target to run; repeat for several (default: all)")
+    parser.add_argument("--runs", type=int, default=1,
+                       help="Repetitions per target, best wall time is kept (default: 1)")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="Baseline results JSON to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                       help="Allowed relative regression against the baseline (default: 0.2)")
+    parser.add_argument("--keep", action="store_true",
+                       help="Keep the generated repository and site directories")
+    parser.add_argument("--tag-parsing", type=int, metavar="N",
+                       help="Only benchmark tag parsing and version selection on N synthetic tags")
+
+    args = parser.parse_args()
+    targets = args.target or list(TARGETS)
+
+    if args.tag_parsing:
+        run_tag_parsing_benchmark(args)
+        return
+
+    work_dir = Path(tempfile.mkdtemp(prefix="sync-bench-"))
+    try:
+        repo_path = work_dir / "repo"
+        print(f"Generating repository with {args.tags} tags across {args.minor_lines} minor lines...")
+        start = time.perf_counter()
+        repo_info = generate_repository(
+            repo_path, args.tags, args.minor_lines, args.files_per_dir,
+            args.file_size, args.change_ratio, args.seed
+        )
+        print(f"✓ Generated {repo_info['tags']} tags in {time.perf_counter() - start:.2f}s")
+
+        log_path = work_dir / "spawn.log"
+        env = make_spawn_shims(work_dir / "shims", log_path)
+
+        results = {
+            "created": datetime.now().astimezone().isoformat(),
+            "python": platform.python_version(),
+            "git": subprocess.run(["git", "--version"], capture_output=True, text=True).stdout.strip(),
+            "config": {
+                "tags": args.tags,
+                "minor_lines": args.minor_lines,
+                "files_per_dir": args.files_per_dir,
+                "file_size": args.file_size,
+                "change_ratio": args.change_ratio,
+                "seed": args.seed,
+                "runs": args.runs,
+            },
+            "repository": repo_info,
+            "results": [],
+        }
+
+        for target in targets:
+            best = {}
+            for run in range(args.runs):
+                site_dir = work_dir / f"site-{target}-{run}"
+                command = [
+                    part.format(repo=repo_path, site=site_dir, minor_lines=args.minor_lines)
+                    for part in TARGETS[target]
+                ]
+                make_site(site_dir)
+                for scenario in ("cold", "warm"):
+                    result = run_target(command, site_dir, env, log_path)
+                    if scenario not in best or result["wall_time_s"] < best[scenario]["wall_time_s"]:
+                        best[scenario] = result
+                if not args.keep:
+                    shutil.rmtree(site_dir)
+
+            for scenario, result in best.items():
+                results["results"].append({"target": target, "scenario": scenario, **result})
+                print(f"✓ {target:<22} {scenario:<5} {result['wall_time_s']:>8.3f}s  "
+                      f"rss {result['peak_rss_kb']:>7} KiB  "
+                      f"procs {result['subprocesses_total']:>5}  "
+                      f"written {result['bytes_written']:>10} B")
+
+        report(results, args)
+    finally:
+        if args.keep:
+            print(f"Kept benchmark files in {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
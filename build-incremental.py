@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+
+"""
+Incremental Jekyll build driven by the docs sync change manifest
+Usage: python build-incremental.py [--manifest=_docs/.sync_manifest.json] [--site-dir=_site]
+       [--dry-run] [-- <extra jekyll build arguments>]
+
+Run after sync-docs-optimized.py. This script:
+1. Reads the added, modified and deleted paths the sync recorded under _docs/
+   (every source's, in multi-source --config mode)
+2. Skips Jekyll entirely when the sync changed nothing
+3. Removes the built output of deleted and changed pages; Jekyll re-renders
+   a page whose output is missing even if its source mtime did not move
+   (e.g. pages recorded because their version's navigation changed)
+4. Runs `jekyll build --incremental`, which only re-renders pages whose
+   source changed or whose output is missing; the sync leaves unchanged
+   files and their mtimes alone
+5. Falls back to a full build when there is no previous build to update
+6. Consumes the manifest once the build succeeds, so the next sync starts
+   a fresh one
+"""
+
+import sys
+import subprocess
+import json
+from pathlib import Path, PurePosixPath
+from typing import List, Dict, Set
+import argparse
+
+
+def output_path(source: str) -> str:
+    """Site-relative output of a docs collection file (permalink /:collection/:path)."""
+    path = PurePosixPath(source)
+    relative = PurePosixPath("docs", *path.parts[1:])
+    if path.suffix.lower() == ".md":
+        return str(relative.with_suffix(".html"))
+    return str(relative)
+
+
+class IncrementalBuild:
+    def __init__(self, manifest_path: Path, site_dir: Path, jekyll_args: List[str]):
+        self.manifest_path = manifest_path
+        self.site_dir = site_dir
+        self.jekyll_args = jekyll_args
+        self.manifest = self.load_manifest()
+
+    def load_manifest(self) -> Dict:
+        try:
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠ Warning: Could not read {self.manifest_path}: {e}")
+            return {}
+
+    def has_previous_build(self) -> bool:
+        return self.site_dir.is_dir() and Path(".jekyll-metadata").exists()
+
+    def changed_sources(self) -> Set[str]:
+        return {path for kind in ("added", "modified", "deleted") for path in self.manifest.get(kind, [])}
+
+    def affected_outputs(self) -> Dict[str, List[str]]:
+        """Outputs to re-render and outputs to remove, relative to the site directory.
+        
+        The 'latest' redirect stubs are listed like any other file, so they need no special case.
+        """
+        rebuilt = {output_path(source) for kind in ("added", "modified") for source in self.manifest.get(kind, [])}
+        removed = {output_path(source) for source in self.manifest.get("deleted", [])}
+        return {"rebuilt": sorted(rebuilt), "removed": sorted(removed)}
+
+    def remove_outputs(self, outputs: List[str]):
+        for output in outputs:
+            target = self.site_dir / output
+            if target.is_symlink() or target.exists():
+                target.unlink()
+
+    def jekyll_build(self) -> int:
+        # --incremental on a fresh build too, so it writes the .jekyll-metadata the next run needs
+        command = ["bundle", "exec", "jekyll", "build", "--incremental", "--destination", str(self.site_dir)]
+        command.extend(self.jekyll_args)
+        print(f"Running {' '.join(command)}")
+        return subprocess.run(command).returncode
+
+    def run(self, dry_run: bool = False) -> int:
+        if not self.has_previous_build():
+            print(f"No previous build in {self.site_dir}; running a full build")
+            if dry_run:
+                return 0
+            return self.finish(self.jekyll_build())
+
+        if not self.manifest:
+            # No sync since the last build; layouts or pages outside _docs may still have changed
+            print(f"No change manifest at {self.manifest_path}; letting Jekyll decide what to rebuild")
+            return 0 if dry_run else self.jekyll_build()
+
+        outputs = self.affected_outputs()
+        if not self.changed_sources():
+            print("✓ Sync changed nothing under _docs/; skipping the build")
+            if not dry_run:
+                self.manifest_path.unlink()
+            return 0
+
+        touched = self.manifest.get("versions", {}).get("touched", [])
+        print(f"Rebuilding {len(outputs['rebuilt'])} pages and removing {len(outputs['removed'])} outputs "
+              f"(versions touched: {', '.join(touched) or 'none'})")
+        if dry_run:
+            for output in outputs["rebuilt"]:
+                print(f"  rebuild {output}")
+            for output in outputs["removed"]:
+                print(f"  remove  {output}")
+            return 0
+
+        self.remove_outputs(outputs["removed"] + outputs["rebuilt"])
+        return self.finish(self.jekyll_build())
+
+    def finish(self, returncode: int) -> int:
+        """Consume the manifest after a successful build; keep it for a retry otherwise."""
+        if returncode != 0:
+            print(f"✗ Jekyll build failed; keeping {self.manifest_path} for the next attempt")
+            return returncode
+        if self.manifest_path.exists():
+            self.manifest_path.unlink()
+        print(f"✓ Site updated in {self.site_dir}")
+        return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Rebuild only the site pages changed by the last docs sync",
+        epilog="Arguments after -- are passed to jekyll build (e.g. -- --baseurl /asthra)"
+    )
+    parser.add_argument("--manifest", default="_docs/.sync_manifest.json",
+                       help="Change manifest written by sync-docs-optimized.py "
+                            "(default: _docs/.sync_manifest.json)")
+    parser.add_argument("--site-dir", default="_site",
+                       help="Built site directory to update (default: _site)")
+    parser.add_argument("--dry-run", action="store_true",
+                       help="Print the outputs that would be rebuilt or removed without building")
+
+    argv = sys.argv[1:]
+    jekyll_args = []
+    if "--" in argv:
+        split = argv.index("--")
+        argv, jekyll_args = argv[:split], argv[split + 1:]
+    args = parser.parse_args(argv)
+
+    if not Path("_config.yml").exists():
+        print("Error: run from the site root (no _config.yml found)")
+        sys.exit(1)
+
+    build = IncrementalBuild(Path(args.manifest), Path(args.site_dir), jekyll_args)
+    sys.exit(build.run(dry_run=args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,10 @@
 
 # Script to sync versioned documentation from local asthra repository
 # Assumes asthra repo is located at ../asthra relative to this script
+#
+# Usage: ./local-sync-docs.sh [--watch]
+#   --watch  keep running and re-sync only the minor lines whose tags are
+#            added, moved or deleted (run 'bundle exec jekyll serve' alongside)
 
 set -e  # Exit on any error
 
@@ -21,6 +25,11 @@ if [ ! -d "../asthra/.git" ]; then
     exit 1
 fi
 
+if [ "$1" = "--watch" ]; then
+    # Reads tags straight from git objects, so the working copy is never checked out
+    exec python3 sync-docs-optimized.py ../asthra --watch
+fi
+
 # Use shared Python sync script (now handles versioned docs)
 python3 sync-docs.py ../asthra
 
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+
+"""
+Precompress the built site for servers that serve static .gz files
+Usage: python precompress-site.py [site_dir=_site] [--workers=4] [--cache-dir=.precompress-cache]
+       [--extensions=html,json,svg] [--min-size=256]
+
+Run after `jekyll build`. This script:
+1. Writes a .gz sibling at maximum compression for every HTML, JSON and SVG
+   file in the built site (e.g. for nginx `gzip_static on;`)
+2. Compresses in a process pool
+3. Caches compressed output by SHA-256 of the original content, so a deploy
+   only recompresses files whose content changed
+4. Skips files where gzip would not save any bytes
+"""
+
+import sys
+import os
+import shutil
+import gzip
+import hashlib
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Dict, Set
+import argparse
+
+
+def compress_file(source_path: str, dest_path: str) -> int:
+    """Process pool entry point: gzip one file into the cache, returning the compressed size."""
+    with open(source_path, "rb") as source:
+        # mtime=0 keeps the output a pure function of the input
+        data = gzip.compress(source.read(), compresslevel=9, mtime=0)
+
+    dest = Path(dest_path)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=dest.parent, prefix=".tmp-")
+    with os.fdopen(fd, "wb") as temp:
+        temp.write(data)
+    os.chmod(temp_path, 0o644)
+    os.replace(temp_path, dest)
+    return len(data)
+
+
+class SitePrecompressor:
+    def __init__(self, site_dir: Path, cache_dir: Path, extensions: List[str],
+                 workers: int = 4, min_size: int = 256):
+        self.site_dir = site_dir
+        self.cache_dir = cache_dir
+        self.extensions = {f".{extension.lstrip('.').lower()}" for extension in extensions}
+        self.workers = max(workers, 1)
+        self.min_size = min_size
+        self.stats = {
+            "files": 0,
+            "compressed": 0,
+            "cached": 0,
+            "skipped": 0,
+            "bytes_in": 0,
+            "bytes_out": 0
+        }
+
+    def cache_path(self, digest: str) -> Path:
+        return self.cache_dir / digest[:2] / f"{digest[2:]}.gz"
+
+    @staticmethod
+    def content_hash(path: Path) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def find_files(self) -> List[Path]:
+        """List files to compress, skipping symlinks and existing .gz files."""
+        return sorted(
+            path for path in self.site_dir.rglob("*")
+            if path.suffix.lower() in self.extensions and path.is_file() and not path.is_symlink()
+        )
+
+    def place(self, compressed: Path, target: Path):
+        """Put a cached .gz next to its original, hardlinking where possible."""
+        if target.is_symlink() or target.exists():
+            target.unlink()
+        try:
+            os.link(compressed, target)
+        except OSError:
+            shutil.copyfile(compressed, target)
+
+    def run(self) -> Dict[str, int]:
+        files = self.find_files()
+        digests = {}
+        for path in files:
+            size = path.stat().st_size
+            if size < self.min_size:
+                self.stats["skipped"] += 1
+                continue
+            digests[path] = self.content_hash(path)
+            self.stats["bytes_in"] += size
+
+        # Identical files (e.g. pages shared across versions) are compressed once
+        pending = {
+            digest: path for path, digest in digests.items()
+            if not self.cache_path(digest).exists()
+        }
+        unique = len(set(digests.values()))
+        print(f"Compressing {len(pending)} of {unique} distinct files "
+              f"({unique - len(pending)} cached) with {self.workers} workers...")
+
+        if pending:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                # Large chunks: most site files are small, so per-task IPC would dominate
+                chunk_size = max(len(pending) // (self.workers * 4), 1)
+                list(executor.map(
+                    compress_file,
+                    [str(path) for path in pending.values()],
+                    [str(self.cache_path(digest)) for digest in pending],
+                    chunksize=chunk_size
+                ))
+        self.stats["compressed"] = len(pending)
+        self.stats["cached"] = unique - len(pending)
+
+        for path, digest in digests.items():
+            compressed = self.cache_path(digest)
+            target = path.with_name(path.name + ".gz")
+            compressed_size = compressed.stat().st_size
+            if compressed_size >= path.stat().st_size:
+                # No gain; let the server send the original
+                if target.exists():
+                    target.unlink()
+                self.stats["skipped"] += 1
+                self.stats["bytes_out"] += path.stat().st_size
+                continue
+            self.place(compressed, target)
+            self.stats["files"] += 1
+            self.stats["bytes_out"] += compressed_size
+
+        removed = self.prune(set(digests.values()))
+        if removed:
+            print(f"✓ Pruned {removed} unused cache entries")
+        return self.stats
+
+    def prune(self, live: Set[str]) -> int:
+        """Drop cache entries for content that is no longer part of the site."""
+        removed = 0
+        for entry in self.cache_dir.glob("*/*.gz"):
+            if entry.parent.name + entry.name[:-len(".gz")] not in live:
+                entry.unlink()
+                removed += 1
+        return removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write .gz siblings for the built site")
+    parser.add_argument("site_dir", nargs="?", default="_site",
+                       help="Built site directory (default: _site)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4,
+                       help="Number of compression processes (default: CPU count)")
+    parser.add_argument("--cache-dir", default=".precompress-cache",
+                       help="Compressed output cache, keyed by content hash (default: .precompress-cache)")
+    parser.add_argument("--extensions", default="html,json,svg",
+                       help="Comma-separated file extensions to compress (default: html,json,svg)")
+    parser.add_argument("--min-size", type=int, default=256,
+                       help="Skip files smaller than this many bytes (default: 256)")
+
+    args = parser.parse_args()
+
+    site_dir = Path(args.site_dir)
+    if not site_dir.is_dir():
+        print(f"Error: built site not found at {site_dir}")
+        sys.exit(1)
+
+    cache_dir = Path(args.cache_dir)
+    if cache_dir.resolve().is_relative_to(site_dir.resolve()):
+        # Jekyll wipes the site directory on every build
+        print(f"Error: cache directory {cache_dir} must be outside {site_dir}")
+        sys.exit(1)
+
+    precompressor = SitePrecompressor(
+        site_dir=site_dir,
+        cache_dir=cache_dir,
+        extensions=args.extensions.split(","),
+        workers=args.workers,
+        min_size=args.min_size
+    )
+    stats = precompressor.run()
+
+    saved = stats["bytes_in"] - stats["bytes_out"]
+    print(f"✓ Wrote {stats['files']} .gz files ({stats['compressed']} compressed, "
+          f"{stats['cached']} from cache, {stats['skipped']} skipped)")
+    print(f"✓ {stats['bytes_in']} bytes -> {stats['bytes_out']} bytes ({saved} saved)")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,15 +2,55 @@
 
 """
 Optimized versioned documentation sync script
-Usage: python sync-docs-optimized.py <source_repo_path> [--max-versions=10] [--parallel=4]
+Usage: python sync-docs-optimized.py <source_repo_path> [--max-versions=10] [--parallel=4] [--force]
+       [--engine=thread [--git-backend=cat-file|subprocess] | --engine=async] [--source=URL]
+       [--no-transform | --prerender] [--fail-on-broken-links] [--watch [--watch-interval=0.5]]
+       [--metrics-out=FILE] [--metrics-format=json|prometheus] [--profile[=FILE]]
+       [--cache-dir=DIR [--cache-size=512]]
+       python sync-docs-optimized.py --config=sources.toml [--parallel=8] [...]
 
 This optimized version addresses scalability concerns:
-1. Parallel processing of versions
-2. Incremental updates (only process changed versions)
+1. Parallel processing of versions (thread pool or asyncio pipeline)
+2. Incremental updates (skip versions whose docs tree OIDs are unchanged)
 3. Configurable limits on number of versions
-4. Memory-efficient tag processing
-5. Git archive instead of checkout for better performance
-6. Caching and deduplication
+4. Streamed tag enumeration that stops after max_versions minor lines,
+   with commits and docs trees resolved in a single batch
+5. Persistent git cat-file backend (or one streamed git archive per version)
+6. Content-addressed object store with hardlinks to deduplicate identical files
+7. Optional managed mirror (--source): a bare, blobless clone that is fetched
+   incrementally and only hydrates the blobs under the synced docs trees
+8. Markdown post-processing (front matter, .md link rewriting, heading
+   normalization) in a process pool, cached by source blob OID
+9. Sharded per-version search index under assets/search/, rebuilt only for
+   versions whose docs changed
+10. Cross-version internal link check against one path index, re-reading
+    only pages that changed since the last run
+11. Watch mode (--watch) that polls refs/tags and packed-refs and re-syncs
+    only the minor lines whose tags moved
+12. A manifest of changed paths under _docs/ (_docs/.sync_manifest.json,
+    shared by every source in --config mode) for build-incremental.py, so
+    the site build only re-renders what changed
+13. "Changes since X.Y" pages for adjacent versions from one diff-tree per
+    tag pair, cached so each pair is diffed once
+14. Newest-first scheduling with progressive publishing: 'latest' and the
+    index move as soon as the newest versions land, not after the slowest
+15. Multi-source mode (--config): several repositories synced concurrently
+    into their own targets under _docs/, sharing one worker budget and one
+    object store
+16. 'latest' as static redirect stubs built from the newest version's page
+    index, instead of a symlink Jekyll renders as a second full copy
+17. Optional prerendering (--prerender) of Markdown to HTML in the process
+    pool, cached by blob OID, so Jekyll only wraps ready-made HTML
+18. Per-version navigation data (_data/docs_nav/<version>.json, with dots
+    written as underscores) holding the page tree, titles and prev/next
+    links, rebuilt only for versions whose docs changed
+19. Crash-safe, resumable syncs: each version is built under _docs/.staging/
+    and swapped into place (atomically where renameat2 is available), and a
+    journal (_docs/.sync_journal.json) lets a restarted run skip the
+    versions an interrupted one completed
+20. Portable artifact cache (--cache-dir) of docs trees keyed by tree OID,
+    with LRU eviction, so a fresh checkout restores known versions instead
+    of reading them from git
 """
 
 import sys
@@ -18,26 +58,2187 @@ import os
 import shutil
 import subprocess
 import tempfile
-import hashlib
+import tarfile
+import threading
+import queue
+import io
 import json
-from pathlib import Path
-from typing import List, Dict, Optional, Set
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import hashlib
+import ctypes
+import errno
+from datetime import datetime
+from pathlib import Path, PurePosixPath
+from typing import List, Dict, Optional, Set, Callable, NamedTuple, Iterable, Iterator
+from contextlib import contextmanager, closing, nullcontext
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 import argparse
-import semver
+import asyncio
+import heapq
+import re
+import contextvars
+import cProfile
+import pstats
+import time
+import multiprocessing
+import importlib.util
+import posixpath
+from urllib.parse import unquote
+from html import unescape
+
+
+# Plain release tags (vX.Y.Z) take the fast path; semver is only imported for tags
+# with build metadata, the one release form the regex cannot validate on its own.
+RELEASE_TAG_RE = re.compile(r"v?(0|[1-9]\d*)\.(0|[1-9]\d*)\.(0|[1-9]\d*)")
+EXTENDED_TAG_RE = re.compile(r"v?(0|[1-9]\d*)\.(0|[1-9]\d*)\.(0|[1-9]\d*)([-+])")
+
+
+class ReleaseVersion(NamedTuple):
+    """A stable release version; formats as written in its tag, without the 'v'."""
+    
+    major: int
+    minor: int
+    patch: int
+    text: str
+    
+    def __str__(self) -> str:
+        return self.text
+
+
+def parse_release_tag(tag: str) -> Optional[ReleaseVersion]:
+    """Parse a stable release tag, returning None for pre-releases and non-versions."""
+    match = RELEASE_TAG_RE.fullmatch(tag)
+    if match:
+        return ReleaseVersion(int(match[1]), int(match[2]), int(match[3]), tag[1:] if tag[0] == 'v' else tag)
+    
+    match = EXTENDED_TAG_RE.match(tag)
+    if not match or match[4] == '-':
+        # Not a version, or a pre-release (valid or not, it is skipped either way)
+        return None
+    
+    import semver
+    version_str = tag[1:] if tag[0] == 'v' else tag
+    try:
+        version = semver.VersionInfo.parse(version_str)
+    except ValueError:
+        return None
+    return ReleaseVersion(version.major, version.minor, version.patch, version_str)
+
+
+# Markdown post-processing. Everything here is independent of the version a page
+# is synced into, so results can be shared by every version carrying the same blob.
+FENCE_RE = re.compile(r"^\s{0,3}(`{3,}|~{3,})")
+# '##Title' is read as a heading missing its space; a lone '#word' stays prose (e.g. #include)
+ATX_HEADING_RE = re.compile(r"^\s{0,3}(#{1,6})(?:[ \t]+|(?<=##)(?=[^#\s])|$)(.*?)(?:[ \t]+#+)?[ \t]*$")
+SETEXT_RE = re.compile(r"^\s{0,3}(=+|-+)\s*$")
+BLOCK_START_RE = re.compile(r"^\s{0,3}(?:[#>|]|[-*+]\s|\d+[.)]\s)")
+INLINE_LINK_RE = re.compile(r"(\]\()(<[^>\n]*>|[^)\s]+)")
+REFERENCE_LINK_RE = re.compile(r"^(\s{0,3}\[[^\]]+\]:[ \t]*)(<[^>\n]*>|\S+)")
+URL_SCHEME_RE = re.compile(r"^[A-Za-z][A-Za-z0-9+.-]*:")
+CODE_SPAN_RE = re.compile(r"(`+)(?!`).*?(?<!`)\1(?!`)")
+INDENTED_CODE_RE = re.compile(r"^(?: {4}|\t)")
+LIST_ITEM_RE = re.compile(r"^\s{0,3}(?:[-*+]|\d+[.)])\s")
+
+
+def process_pool(workers: int) -> ProcessPoolExecutor:
+    """Process pool whose workers do not inherit open pipes.
+    
+    Forked workers would hold the write end of the cat-file readers' stdin,
+    so closing a reader would wait for its timeout instead of EOF.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+    return ProcessPoolExecutor(max_workers=max(workers, 1), mp_context=context)
+
+
+# renameat2() swaps two paths in one step with RENAME_EXCHANGE (Linux 3.15+, glibc 2.28+)
+AT_FDCWD = -100
+RENAME_EXCHANGE = 2
+try:
+    _renameat2 = ctypes.CDLL(None, use_errno=True).renameat2
+except (OSError, AttributeError, TypeError):
+    _renameat2 = None
+
+
+def exchange_paths(first: Path, second: Path) -> bool:
+    """Atomically swap two existing paths; False where the platform or filesystem cannot."""
+    if _renameat2 is None:
+        return False
+    if _renameat2(AT_FDCWD, os.fsencode(first), AT_FDCWD, os.fsencode(second), RENAME_EXCHANGE) == 0:
+        return True
+    error = ctypes.get_errno()
+    if error in (errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP):
+        return False
+    raise OSError(error, os.strerror(error), str(first), None, str(second))
+
+
+def rewrite_doc_link(target: str) -> str:
+    """Point a relative link to a .md file at the page Jekyll renders for it.
+    
+    Pages are served at /docs/<version>/<path> without the extension, so
+    dropping '.md' keeps relative links inside the version they appear in.
+    """
+    bracketed = target.startswith("<")
+    url = target[1:-1] if bracketed else target
+    if not url or URL_SCHEME_RE.match(url) or url.startswith(("/", "#")):
+        return target
+    path, sep, fragment = url.partition("#")
+    if not path.lower().endswith(".md"):
+        return target
+    url = path[:-3] + sep + fragment
+    return f"<{url}>" if bracketed else url
+
+
+def rewrite_line_links(line: str) -> str:
+    """Rewrite the .md links of one line, leaving inline code spans alone."""
+    segments = []
+    start = 0
+    for span in [*CODE_SPAN_RE.finditer(line), None]:
+        end = span.start() if span else len(line)
+        segment = INLINE_LINK_RE.sub(lambda m: m[1] + rewrite_doc_link(m[2]), line[start:end])
+        if start == 0:
+            segment = REFERENCE_LINK_RE.sub(lambda m: m[1] + rewrite_doc_link(m[2]), segment)
+        segments.append(segment)
+        if span:
+            segments.append(span[0])
+            start = span.end()
+    return "".join(segments)
+
+
+def split_front_matter(text: str) -> tuple:
+    """Split a document into its front matter block (with delimiters) and body."""
+    if text.startswith("---\n"):
+        end = text.find("\n---\n", 3)
+        if end != -1:
+            return text[:end + 5], text[end + 5:]
+    return "", text
+
+
+def normalize_markdown(text: str) -> str:
+    """Rewrite intra-doc links and normalize headings, leaving code blocks alone.
+    
+    Headings become ATX style ('## Title'), lose closing hashes, and never
+    skip a level below the previous heading. Fenced and indented code blocks
+    and inline code spans are left as written.
+    """
+    front_matter, body = split_front_matter(text)
+    lines = body.split("\n")
+    output = []
+    fence = None
+    previous_level = 0
+    after_heading = False
+    # Indented lines continue a list item rather than start a code block
+    in_list = False
+    in_indented_code = False
+    
+    def heading(level: int, title: str) -> str:
+        nonlocal previous_level
+        if previous_level:
+            level = min(level, previous_level + 1)
+        previous_level = level
+        return f"{'#' * level} {title.strip()}".rstrip()
+    
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        fence_match = FENCE_RE.match(line)
+        if fence or fence_match:
+            after_heading = False
+        if fence:
+            if fence_match and fence_match[1][0] == fence[0] and len(fence_match[1]) >= len(fence):
+                fence = None
+            output.append(line)
+            i += 1
+            continue
+        if fence_match:
+            fence = fence_match[1]
+            output.append(line)
+            i += 1
+            continue
+        
+        # An indented code block starts after a blank line and runs until an unindented line
+        if not line.strip():
+            pass
+        elif INDENTED_CODE_RE.match(line):
+            in_indented_code = in_indented_code or (not in_list and (not output or not output[-1].strip()))
+        else:
+            in_indented_code = False
+            if LIST_ITEM_RE.match(line):
+                in_list = True
+            elif not output or not output[-1].strip():
+                in_list = False
+        if in_indented_code:
+            output.append(line)
+            after_heading = False
+            i += 1
+            continue
+        
+        line = rewrite_line_links(line)
+        
+        atx = ATX_HEADING_RE.match(line)
+        if atx:
+            output.append(heading(len(atx[1]), atx[2]))
+            after_heading = True
+            i += 1
+            continue
+        
+        # A one-line paragraph underlined with '=' or '-' is a setext heading
+        underline = SETEXT_RE.match(lines[i + 1]) if i + 1 < len(lines) else None
+        starts_paragraph = not output or not output[-1].strip() or after_heading
+        if underline and line.strip() and starts_paragraph and not BLOCK_START_RE.match(line):
+            output.append(heading(1 if underline[1][0] == "=" else 2, line))
+            after_heading = True
+            i += 2
+            continue
+        
+        output.append(line)
+        after_heading = False
+        i += 1
+    
+    return front_matter + "\n".join(output)
+
+
+def add_front_matter(text: str, fields: Dict[str, str]) -> str:
+    """Add front matter fields a document does not already define."""
+    front_matter, body = split_front_matter(text)
+    defined = set(re.findall(r"^([A-Za-z_][\w-]*)\s*:", front_matter, re.MULTILINE))
+    entries = "".join(
+        f"{key}: {json.dumps(value)}\n" for key, value in fields.items() if key not in defined
+    )
+    if front_matter:
+        return front_matter[:-4] + entries + "---\n" + body
+    return f"---\n{entries}---\n" + body
+
+
+# Python-Markdown extensions closest to the kramdown features the docs use
+# (tables, fenced code, footnotes, attribute lists). Code blocks are highlighted
+# with Pygments, whose token classes are the ones rouge emits for the site's
+# syntax highlighting styles.
+PRERENDER_EXTENSIONS = ["extra", "sane_lists", "codehilite"]
+PRERENDER_CONFIG = {"codehilite": {"css_class": "highlight", "guess_lang": False}}
+HEADING_ID_RE = re.compile(r"\{:?\s*#[^}]*\}\s*$")
+
+
+def kramdown_id(title: str, used: Dict[str, int]) -> str:
+    """The id kramdown's auto_ids give a heading with this source text."""
+    # Leading non-letters go, then everything but ASCII letters, digits, spaces and dashes
+    slug = re.sub(r"[^a-zA-Z0-9 -]", "", re.sub(r"^[^a-zA-Z]+", "", title)).replace(" ", "-").lower()
+    slug = slug or "section"
+    if slug in used:
+        used[slug] += 1
+        return f"{slug}-{used[slug]}"
+    used[slug] = 0
+    return slug
+
+
+def add_heading_ids(body: str) -> str:
+    """Give every heading without an explicit id the one kramdown would generate.
+    
+    kramdown builds ids from a heading's Markdown source, so they are added
+    here as {#id} attributes rather than left to Python-Markdown, and
+    #fragment links into prerendered pages keep working.
+    """
+    lines = body.split("\n")
+    used = {}
+    fence = None
+    for i, line in enumerate(lines):
+        fence_match = FENCE_RE.match(line)
+        if fence:
+            if fence_match and fence_match[1][0] == fence[0] and len(fence_match[1]) >= len(fence):
+                fence = None
+            continue
+        if fence_match:
+            fence = fence_match[1]
+            continue
+        atx = ATX_HEADING_RE.match(line)
+        if atx and atx[2].strip() and not HEADING_ID_RE.search(atx[2]):
+            lines[i] = f"{line.rstrip()} {{#{kramdown_id(atx[2].strip(), used)}}}"
+    return "\n".join(lines)
+
+
+def render_html(body: str) -> str:
+    """Render a normalized Markdown body to an HTML fragment."""
+    # Optional dependencies, only needed with --prerender
+    import markdown
+    return markdown.markdown(add_heading_ids(body), extensions=PRERENDER_EXTENSIONS,
+                             extension_configs=PRERENDER_CONFIG, output_format="html")
+
+
+def write_cache_file(dest_path: str, data: bytes):
+    """Write a transform cache file atomically, creating its directory."""
+    dest = Path(dest_path)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=dest.parent, prefix=".tmp-")
+    with os.fdopen(fd, "wb") as temp:
+        temp.write(data)
+    os.chmod(temp_path, 0o644)
+    os.replace(temp_path, dest)
+
+
+def transform_markdown(jobs: List[tuple]) -> None:
+    """Process pool entry point: normalize stored blobs into the transform cache.
+    
+    Takes a list of (source_path, dest_path, html_path) jobs; pages are small,
+    so one task per page would spend more time in IPC than in normalize_markdown.
+    An empty source_path means dest_path is already cached; an empty html_path
+    means no HTML is prerendered.
+    """
+    for source_path, dest_path, html_path in jobs:
+        if source_path:
+            with open(source_path, "rb") as source:
+                text = normalize_markdown(source.read().decode("utf-8", "surrogateescape"))
+            write_cache_file(dest_path, text.encode("utf-8", "surrogateescape"))
+        else:
+            with open(dest_path, "rb") as cached:
+                text = cached.read().decode("utf-8", "surrogateescape")
+        if html_path:
+            _, body = split_front_matter(text)
+            write_cache_file(html_path, render_html(body).encode("utf-8", "surrogateescape"))
+
+
+# Link checking. Links are reduced to site paths ("/docs/0.3/spec/types") so that
+# checking one is a set lookup against the paths the synced trees serve.
+DOC_LINK_RE = re.compile(
+    r"\]\(\s*<?([^)\s>]+)"                          # [text](target)
+    r"|^\s{0,3}\[[^\]]+\]:\s*<?([^\s>]+)"            # [label]: target
+    r"|\b(?:href|src)\s*=\s*[\"']([^\"']+)[\"']"     # raw HTML
+)
+PRE_START_RE = re.compile(r"^\s{0,3}<pre[\s>]")
+
+
+def page_url(relative_path: str) -> str:
+    """Site path Jekyll serves a file of the docs collection at."""
+    if relative_path.lower().endswith(".md"):
+        relative_path = relative_path[:-3]
+    return f"/docs/{relative_path}"
+
+
+def link_key(path: str) -> str:
+    """Normalize a site path so every spelling of one page maps to the same key."""
+    path = unquote(path)
+    if path.endswith("/"):
+        path += "index"
+    elif path.endswith(".html"):
+        path = path[:-len(".html")]
+    return path
+
+
+def extract_doc_links(path: str, relative_path: str) -> List[tuple]:
+    """Read a page once and return its internal links as (target, resolved key).
+    
+    Fenced code and HTML <pre> blocks (prerendered code) are skipped. External,
+    mailto and fragment-only links are dropped.
+    """
+    base = posixpath.dirname(page_url(relative_path)) + "/"
+    links = []
+    fence = None
+    in_pre = False
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            if in_pre or PRE_START_RE.match(line):
+                in_pre = "</pre>" not in line
+                continue
+            fence_match = FENCE_RE.match(line)
+            if fence:
+                if fence_match and fence_match[1][0] == fence[0] and len(fence_match[1]) >= len(fence):
+                    fence = None
+                continue
+            if fence_match:
+                fence = fence_match[1]
+                continue
+            for match in DOC_LINK_RE.finditer(line):
+                target = match[1] or match[2] or match[3]
+                if URL_SCHEME_RE.match(target) or target.startswith(("#", "//", "{")):
+                    continue
+                link_path = target.split("#", 1)[0].split("?", 1)[0]
+                resolved = posixpath.normpath(posixpath.join(base, link_path))
+                if link_path.endswith("/"):
+                    resolved += "/"
+                links.append((target, link_key(resolved)))
+    return links
+
+
+def extract_links_batch(jobs: List[tuple]) -> List[tuple]:
+    """Process pool entry point: extract the links of (path, relative_path) pages."""
+    return [(relative_path, extract_doc_links(path, relative_path)) for path, relative_path in jobs]
+
+
+class SyncMetrics:
+    """Phase timers and per-version counters for one sync run.
+    
+    Counters are attributed to the version set with for_version(), which is
+    tracked in a context variable so it follows both worker threads and
+    asyncio tasks.
+    """
+    
+    VERSION_COUNTERS = ["files", "bytes", "new_blobs", "store_hits", "subprocesses", "cache_hits", "transforms", "seconds"]
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.phases = {}
+        self.versions = {}
+        self.totals = {counter: 0 for counter in self.VERSION_COUNTERS}
+        self.started = datetime.now().astimezone().isoformat()
+        self.current_version = contextvars.ContextVar("sync_version", default=None)
+    
+    def reset(self):
+        """Start a new run (e.g. the next watch iteration) with empty timers and counters."""
+        with self.lock:
+            self.phases = {}
+            self.versions = {}
+            self.totals = {counter: 0 for counter in self.VERSION_COUNTERS}
+            self.started = datetime.now().astimezone().isoformat()
+    
+    @contextmanager
+    def phase(self, name: str):
+        """Time a phase of the run; repeated phases accumulate."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self.lock:
+                self.phases[name] = self.phases.get(name, 0.0) + elapsed
+    
+    @contextmanager
+    def for_version(self, version_key: str):
+        """Attribute counters inside the block to a version."""
+        token = self.current_version.set(version_key)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.count("seconds", time.perf_counter() - start)
+            self.current_version.reset(token)
+    
+    def count(self, counter: str, amount: float = 1):
+        version_key = self.current_version.get()
+        with self.lock:
+            self.totals[counter] = self.totals.get(counter, 0) + amount
+            if version_key is not None:
+                counters = self.versions.setdefault(
+                    version_key, {name: 0 for name in self.VERSION_COUNTERS}
+                )
+                counters[counter] = counters.get(counter, 0) + amount
+    
+    def to_dict(self) -> Dict:
+        with self.lock:
+            return {
+                "started": self.started,
+                "phases": {name: round(seconds, 6) for name, seconds in self.phases.items()},
+                "totals": dict(self.totals),
+                "versions": {key: dict(counters) for key, counters in self.versions.items()}
+            }
+    
+    def to_prometheus(self) -> str:
+        """Render the metrics in the Prometheus textfile collector format."""
+        data = self.to_dict()
+        lines = [
+            "# HELP docs_sync_phase_seconds Wall time spent in each sync phase.",
+            "# TYPE docs_sync_phase_seconds gauge"
+        ]
+        for name, seconds in sorted(data["phases"].items()):
+            lines.append(f'docs_sync_phase_seconds{{phase="{name}"}} {seconds}')
+        for counter in self.VERSION_COUNTERS:
+            metric = f"docs_sync_version_{counter}"
+            lines.append(f"# HELP {metric} Per-version {counter.replace('_', ' ')} of the last sync.")
+            lines.append(f"# TYPE {metric} gauge")
+            for version_key, counters in sorted(data["versions"].items()):
+                lines.append(f'{metric}{{version="{version_key}"}} {counters.get(counter, 0)}')
+            lines.append(f"# HELP docs_sync_{counter} Total {counter.replace('_', ' ')} of the last sync.")
+            lines.append(f"# TYPE docs_sync_{counter} gauge")
+            lines.append(f"docs_sync_{counter} {data['totals'].get(counter, 0)}")
+        return "\n".join(lines) + "\n"
+    
+    def write(self, path: Path, metrics_format: str):
+        """Write the metrics atomically so a textfile collector never reads a partial file."""
+        content = self.to_prometheus() if metrics_format == "prometheus" else json.dumps(self.to_dict(), indent=2)
+        temp_path = path.with_name(f".{path.name}.tmp")
+        temp_path.write_text(content)
+        os.replace(temp_path, path)
+
+
+class ObjectStore:
+    """Content-addressed store of documentation blobs keyed by git blob OID.
+    
+    Version trees are materialized as hardlinks into the store, so files that
+    are identical across versions occupy disk space and write I/O only once.
+    """
+    
+    SYMLINK_MODE = "120000"
+    
+    def __init__(self, root: Path):
+        self.root = root
+        self.lock = threading.Lock()
+        self.in_flight = {}
+        self.reset_stats()
+    
+    def reset_stats(self):
+        """Start a new run's counters (e.g. the next watch iteration)."""
+        with self.lock:
+            self.stats = {
+                "files_linked": 0,
+                "files_copied": 0,
+                "bytes_written": 0,
+                "bytes_materialized": 0,
+                "bytes_first_linked": 0
+            }
+            # Size of each object written this run until its first materialization; Markdown
+            # sources are only read by the transformer and never get that far
+            self.unlinked_writes = {}
+    
+    def object_path(self, oid: str) -> Path:
+        return self.root / oid[:2] / oid[2:]
+    
+    def has(self, oid: str) -> bool:
+        return self.object_path(oid).exists()
+    
+    def add(self, oid: str, source, executable: bool = False) -> None:
+        """Write a blob into the store from a file object (atomic per object)."""
+        self.write(oid, lambda dest: shutil.copyfileobj(source, dest), executable)
+    
+    def write(self, oid: str, writer: Callable, executable: bool = False) -> None:
+        """Write a blob into the store by handing a temp file to writer."""
+        # Workers often need the same new blob at once; only one of them writes it
+        with self.lock:
+            pending = self.in_flight.get(oid)
+            if pending is None:
+                if self.has(oid):
+                    return
+                self.in_flight[oid] = threading.Event()
+        if pending is not None:
+            pending.wait()
+            return
+        
+        object_path = self.object_path(oid)
+        try:
+            object_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=object_path.parent, prefix=".tmp-")
+            try:
+                with os.fdopen(fd, 'wb') as dest:
+                    writer(dest)
+                    written = dest.tell()
+                os.chmod(temp_path, 0o755 if executable else 0o644)
+                os.replace(temp_path, object_path)
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.unlink(temp_path)
+                raise
+            with self.lock:
+                self.stats["bytes_written"] += written
+                self.unlinked_writes[oid] = written
+        finally:
+            with self.lock:
+                self.in_flight.pop(oid).set()
+    
+    def materialize(self, oid: str, mode: str, target: Path) -> int:
+        """Place a stored blob at target, hardlinking where the filesystem allows.
+        
+        Returns the size of the materialized file.
+        """
+        object_path = self.object_path(oid)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        
+        if mode == self.SYMLINK_MODE:
+            link_target = object_path.read_bytes().decode()
+            os.symlink(link_target, target)
+            return len(link_target)
+        
+        try:
+            os.link(object_path, target)
+            linked = True
+        except OSError:
+            # Cross-device store, link limit reached or no hardlink support
+            shutil.copyfile(object_path, target)
+            linked = False
+        
+        size = object_path.stat().st_size
+        with self.lock:
+            self.stats["files_linked" if linked else "files_copied"] += 1
+            self.stats["bytes_materialized"] += size
+            self.stats["bytes_first_linked"] += self.unlinked_writes.pop(oid, 0)
+        return size
+    
+    def bytes_deduplicated(self) -> int:
+        """Bytes materialized beyond the first copy of each object written this run."""
+        return max(self.stats["bytes_materialized"] - self.stats["bytes_first_linked"], 0)
+    
+    def prune(self) -> int:
+        """Remove objects no longer linked from any version tree."""
+        removed = 0
+        if not self.root.exists():
+            return removed
+        for object_path in self.root.glob("*/*"):
+            if object_path.is_file() and object_path.stat().st_nlink <= 1:
+                object_path.unlink()
+                removed += 1
+        return removed
+
+
+class ArtifactCache:
+    """Portable cache of synced docs trees, keyed by git tree OID (--cache-dir).
+    
+    trees/<tree oid>-<transform>.json lists one doc dir's files and the cache
+    files that write them without git: raw blobs under objects/ and, for
+    Markdown, transformed (and prerendered) bodies under transformed/, laid
+    out like the object store and the transform cache. Restoring a tree
+    copies those into place, so a fresh checkout only reads trees it has
+    never seen from git. Trees are evicted least recently used first once
+    the files they need exceed max_bytes.
+    """
+    
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.reset_stats()
+    
+    def reset_stats(self):
+        self.stats = {"restored": 0, "saved": 0, "evicted": 0}
+    
+    def tree_path(self, tree_oid: str, revision: str) -> Path:
+        return self.root / "trees" / f"{tree_oid}-{revision}.json"
+    
+    def load_tree(self, tree_path: Path) -> Optional[Dict]:
+        try:
+            with open(tree_path) as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+    
+    @staticmethod
+    def copy(source: Path, dest: Path):
+        """Copy a file atomically, keeping its mode (executable blobs stay executable)."""
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=dest.parent, prefix=".tmp-")
+        os.close(fd)
+        try:
+            shutil.copyfile(source, temp_path)
+            shutil.copymode(source, temp_path)
+            os.replace(temp_path, dest)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+    
+    def restore(self, tree_oid: str, revision: str, targets: Dict[str, Path]) -> Optional[Dict[str, tuple]]:
+        """Copy a cached tree's files into place, returning its entries (path -> (mode, oid)).
+        
+        targets maps each top-level cache directory to the local directory it
+        mirrors. Returns None if the tree, or any file it needs, is not cached.
+        """
+        tree_path = self.tree_path(tree_oid, revision)
+        with self.lock:
+            tree = self.load_tree(tree_path)
+            if tree is None or not all((self.root / name).is_file() for name in tree["files"]):
+                return None
+            for name in tree["files"]:
+                top, relative = name.split("/", 1)
+                local = targets[top] / relative
+                if not local.exists():
+                    self.copy(self.root / name, local)
+            # The tree's mtime is its last use, for eviction
+            os.utime(tree_path)
+            self.stats["restored"] += 1
+        return {path: tuple(entry) for path, entry in tree["entries"].items()}
+    
+    def save(self, tree_oid: str, revision: str, entries: Dict[str, tuple], files: Set[str],
+             targets: Dict[str, Path]) -> bool:
+        """Add a synced tree to the cache, copying in the local files it needs.
+        
+        Returns False (caching nothing) if any of them is not on disk.
+        """
+        tree_path = self.tree_path(tree_oid, revision)
+        with self.lock:
+            if tree_path.exists() and all((self.root / name).is_file() for name in files):
+                os.utime(tree_path)
+                return True
+            sources = {}
+            for name in files:
+                top, relative = name.split("/", 1)
+                sources[name] = targets[top] / relative
+            if not all(source.is_file() for source in sources.values()):
+                return False
+            for name, source in sources.items():
+                if not (self.root / name).is_file():
+                    self.copy(source, self.root / name)
+            tree_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=tree_path.parent, prefix=".tmp-")
+            with os.fdopen(fd, "w") as f:
+                f.write(json.dumps({"entries": entries, "files": sorted(files)}, separators=(",", ":")))
+            os.chmod(temp_path, 0o644)
+            os.replace(temp_path, tree_path)
+            self.stats["saved"] += 1
+        return True
+    
+    def evict(self) -> int:
+        """Drop least recently used trees until the files the rest need fit in max_bytes.
+        
+        Files no remaining tree needs are removed too. Returns the bytes kept.
+        """
+        with self.lock:
+            tree_paths = sorted((self.root / "trees").glob("*.json"),
+                                key=lambda path: path.stat().st_mtime_ns, reverse=True)
+            kept = set()
+            size = 0
+            full = False
+            for tree_path in tree_paths:
+                tree = self.load_tree(tree_path)
+                if tree is not None and not full:
+                    new = [name for name in tree["files"] if name not in kept]
+                    new_size = sum((self.root / name).stat().st_size
+                                   for name in new if (self.root / name).is_file())
+                    if size + new_size <= self.max_bytes:
+                        kept.update(new)
+                        size += new_size
+                        continue
+                    # Strictly least recently used: everything older goes too
+                    full = True
+                tree_path.unlink()
+                self.stats["evicted"] += 1
+            
+            for top in ("objects", "transformed"):
+                for path in (self.root / top).rglob("*"):
+                    if path.is_file() and path.relative_to(self.root).as_posix() not in kept:
+                        path.unlink()
+        return size
+
+
+class GitObjectReader:
+    """Long-lived `git cat-file --batch` / `--batch-check` pair.
+    
+    Each request is a line on stdin, so resolving trees and reading blobs
+    costs a pipe round trip instead of a process spawn.
+    """
+    
+    CHUNK_SIZE = 64 * 1024
+    
+    def __init__(self, repo_path: Path):
+        self.batch = self._start(repo_path, "--batch")
+        self.check = self._start(repo_path, "--batch-check")
+    
+    @staticmethod
+    def _start(repo_path: Path, mode: str) -> subprocess.Popen:
+        return subprocess.Popen(
+            ["git", "cat-file", mode],
+            cwd=repo_path,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+    
+    @staticmethod
+    def _query(process: subprocess.Popen, spec: str) -> Optional[tuple]:
+        process.stdin.write(spec.encode() + b"\n")
+        process.stdin.flush()
+        header = process.stdout.readline()
+        if not header:
+            raise RuntimeError("git cat-file exited unexpectedly")
+        fields = header.decode().split()
+        if fields[-1] in ("missing", "ambiguous"):
+            return None
+        return fields[0], fields[1], int(fields[2])
+    
+    def info(self, spec: str) -> Optional[tuple]:
+        """Resolve an object spec to (oid, type, size), or None if missing."""
+        return self._query(self.check, spec)
+    
+    def read(self, spec: str) -> Optional[tuple]:
+        """Read a whole object as (type, data), or None if missing."""
+        header = self._query(self.batch, spec)
+        if header is None:
+            return None
+        _, obj_type, size = header
+        data = self.batch.stdout.read(size)
+        self.batch.stdout.read(1)  # trailing newline
+        return obj_type, data
+    
+    def copy_blob(self, oid: str, dest) -> None:
+        """Stream a blob into dest in bounded chunks."""
+        header = self._query(self.batch, oid)
+        if header is None:
+            raise RuntimeError(f"blob {oid} not found")
+        remaining = header[2]
+        while remaining:
+            chunk = self.batch.stdout.read(min(remaining, self.CHUNK_SIZE))
+            if not chunk:
+                raise RuntimeError("git cat-file exited unexpectedly")
+            dest.write(chunk)
+            remaining -= len(chunk)
+        self.batch.stdout.read(1)  # trailing newline
+    
+    def list_tree(self, tree_oid: str, prefix: str) -> Dict[str, tuple]:
+        """Recursively list blobs under a tree as path -> (mode, oid)."""
+        blobs = {}
+        pending = [(tree_oid, prefix)]
+        hash_size = len(tree_oid) // 2
+        while pending:
+            oid, path = pending.pop()
+            obj = self.read(oid)
+            if obj is None or obj[0] != "tree":
+                raise RuntimeError(f"tree {oid} not found")
+            data = obj[1]
+            pos = 0
+            while pos < len(data):
+                space = data.index(b" ", pos)
+                nul = data.index(b"\0", space)
+                mode = data[pos:space].decode().zfill(6)
+                name = data[space + 1:nul].decode(errors="surrogateescape")
+                entry_oid = data[nul + 1:nul + 1 + hash_size].hex()
+                pos = nul + 1 + hash_size
+                if mode == "040000":
+                    pending.append((entry_oid, f"{path}/{name}"))
+                elif mode != "160000":  # skip submodules
+                    blobs[f"{path}/{name}"] = (mode, entry_oid)
+        return blobs
+    
+    def close(self):
+        for process in (self.batch, self.check):
+            try:
+                process.stdin.close()
+                process.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                process.kill()
+
+
+class GitObjectPool:
+    """Small pool of GitObjectReaders shared by the worker threads."""
+    
+    def __init__(self, repo_path: Path, size: int, metrics: Optional[SyncMetrics] = None):
+        self.repo_path = repo_path
+        self.size = max(size, 1)
+        self.metrics = metrics
+        self.idle = queue.Queue()
+        self.readers = []
+        self.lock = threading.Lock()
+    
+    @contextmanager
+    def reader(self):
+        try:
+            reader = self.idle.get_nowait()
+        except queue.Empty:
+            with self.lock:
+                spawn = len(self.readers) < self.size
+                if spawn:
+                    reader = GitObjectReader(self.repo_path)
+                    self.readers.append(reader)
+            if spawn and self.metrics:
+                self.metrics.count("subprocesses", 2)
+            if not spawn:
+                reader = self.idle.get()
+        
+        try:
+            yield reader
+        except BaseException:
+            # A failed request can leave the pipe mid-object, so retire the reader
+            with self.lock:
+                self.readers.remove(reader)
+            reader.close()
+            raise
+        self.idle.put(reader)
+    
+    def close(self):
+        with self.lock:
+            for reader in self.readers:
+                reader.close()
+            self.readers = []
+            # Closed readers must not be handed out again if the pool is reused
+            self.idle = queue.Queue()
+
+
+class DocsMirror:
+    """Bare, blobless mirror of the source repository's tags.
+    
+    The first run clones commits and trees only; later runs fetch just the
+    new tags. Blobs are fetched on demand, and only under the docs trees of
+    the versions being synced.
+    """
+    
+    TAG_REFSPEC = "+refs/tags/*:refs/tags/*"
+    
+    def __init__(self, path: Path, source_url: str, metrics: Optional[SyncMetrics] = None):
+        self.path = path
+        self.source_url = source_url
+        self.metrics = metrics
+    
+    def git(self, args: List[str], input: Optional[str] = None, cwd: Optional[Path] = None) -> str:
+        if self.metrics:
+            self.metrics.count("subprocesses")
+        result = subprocess.run(
+            ["git"] + args,
+            cwd=cwd or self.path,
+            input=input,
+            capture_output=True,
+            text=True,
+            check=True
+        )
+        return result.stdout
+    
+    def ensure(self) -> bool:
+        """Clone the mirror if missing, else fetch new tags. Returns True on a fresh clone."""
+        if not (self.path / "HEAD").exists():
+            print(f"Cloning blobless mirror of {self.source_url}...")
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.git(["clone", "--bare", "--filter=blob:none", self.source_url, str(self.path.resolve())],
+                     cwd=self.path.parent)
+            self.git(["config", "remote.origin.fetch", self.TAG_REFSPEC])
+            return True
+        
+        print(f"Updating mirror from {self.source_url}...")
+        self.git(["remote", "set-url", "origin", self.source_url])
+        self.git(["config", "remote.origin.fetch", self.TAG_REFSPEC])
+        self.git(["fetch", "--prune", "--no-write-fetch-head", "--filter=blob:none", "origin"])
+        return False
+    
+    def hydrate(self, tree_oids: Iterable[str]) -> int:
+        """Fetch every blob missing under the given trees in a single request."""
+        tree_oids = sorted(set(tree_oids))
+        if not tree_oids:
+            return 0
+        
+        listing = self.git(["rev-list", "--objects", "--missing=print", "--stdin"],
+                           input="\n".join(tree_oids) + "\n")
+        missing = [line[1:] for line in listing.splitlines() if line.startswith("?")]
+        if missing:
+            # Same request a lazy promisor fetch makes, batched instead of one per blob
+            self.git(["-c", "fetch.negotiationAlgorithm=noop", "fetch", "origin", "--no-tags",
+                      "--no-write-fetch-head", "--recurse-submodules=no", "--filter=blob:none",
+                      "--stdin"], input="\n".join(missing) + "\n")
+        return len(missing)
+
+
+class RefWatcher:
+    """Polls a repository's tag refs for added, moved and deleted tags.
+    
+    Loose tags live under refs/tags/ and packed ones in packed-refs, so
+    stat()ing those is enough to notice any tag change without running git.
+    The standard library has no inotify binding, hence the mtime poll.
+    """
+    
+    def __init__(self, repo_path: Path, interval: float = 0.5):
+        self.repo_path = repo_path
+        self.interval = interval
+        common_dir = Path(subprocess.run(
+            ["git", "rev-parse", "--git-common-dir"],
+            cwd=repo_path,
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout.strip())
+        if not common_dir.is_absolute():
+            common_dir = repo_path / common_dir
+        self.tags_dir = common_dir / "refs" / "tags"
+        self.packed_refs = common_dir / "packed-refs"
+        self.last_signature = self.signature()
+        self.snapshot = self.tags()
+    
+    def signature(self) -> frozenset:
+        entries = []
+        paths = [self.packed_refs]
+        for root, dirs, files in os.walk(self.tags_dir):
+            paths.append(Path(root))
+            paths.extend(Path(root) / name for name in files)
+        for path in paths:
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((str(path), stat.st_ino, stat.st_size, stat.st_mtime_ns))
+        return frozenset(entries)
+    
+    def tags(self) -> Dict[str, str]:
+        output = subprocess.run(
+            ["git", "for-each-ref", "--format=%(refname:short)%00%(objectname)", "refs/tags"],
+            cwd=self.repo_path,
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout
+        return dict(line.split("\0", 1) for line in output.splitlines() if line)
+    
+    def wait(self) -> Set[str]:
+        """Block until tags change, returning the names of the tags that did."""
+        while True:
+            time.sleep(self.interval)
+            signature = self.signature()
+            if signature == self.last_signature:
+                continue
+            # Let a multi-ref update (e.g. git fetch --tags) finish before reading refs
+            while True:
+                time.sleep(min(self.interval, 0.1))
+                settled = self.signature()
+                if settled == signature:
+                    break
+                signature = settled
+            
+            tags = self.tags()
+            changed = {tag for tag in self.snapshot.keys() | tags.keys() if self.snapshot.get(tag) != tags.get(tag)}
+            self.last_signature, self.snapshot = signature, tags
+            if changed:
+                return changed
+
+
+class MarkdownTransformer:
+    """Turns synced Markdown files into Jekyll pages.
+    
+    Link rewriting and heading normalization run in a process pool and are
+    cached under .transformed/ by source blob OID, so a blob is normalized
+    once no matter how many versions or runs carry it. Finished pages only
+    depend on their blob: the layout derives the version from page.url and
+    _config.yml supplies the layout. So each page is stored once in the
+    object store and hardlinked into every version and source that has it.
+    
+    With prerender, the pool also renders each body to HTML, cached by blob
+    OID as well. Pages then carry the HTML as one markdown="0" block, which
+    kramdown passes through untouched, so the site build skips Markdown
+    conversion of every page. Code is highlighted by Pygments with the
+    classes rouge uses and headings get kramdown's auto ids, but the HTML
+    is Python-Markdown's: kramdown-only syntax (e.g. {:toc}, block IALs)
+    is not rendered the way the site build would.
+    """
+    
+    # Bump when normalize_markdown changes so cached output is rebuilt
+    REVISION = 2
+    # Bump when render_html changes
+    RENDER_REVISION = 2
+    # Bump when the page write_page builds around a body changes
+    PAGE_REVISION = 2
+    # Batches smaller than this (or any batch on one CPU) are transformed inline;
+    # starting the pool costs more
+    INLINE_BYTES = 4 * 1024 * 1024
+    CHUNK_SIZE = 64
+    
+    def __init__(self, root: Path, object_store: ObjectStore, workers: int = 4,
+                 metrics: Optional[SyncMetrics] = None, prerender: bool = False):
+        self.root = root
+        self.cache_dir = root / f"r{self.REVISION}"
+        self.prerender = prerender
+        self.html_dir = root / f"html{self.RENDER_REVISION}"
+        # Recorded with each synced version: pages differ with and without prerendering
+        self.revision = f"{self.REVISION}.{self.PAGE_REVISION}" + (
+            f"+html{self.RENDER_REVISION}" if prerender else ""
+        )
+        self.object_store = object_store
+        self.workers = max(workers, 1)
+        self.metrics = metrics
+        self.lock = threading.Lock()
+        self.pool = None
+        self.pending = {}
+    
+    @staticmethod
+    def handles(path: str, mode: str) -> bool:
+        return mode in ("100644", "100755") and path.lower().endswith(".md")
+    
+    def body_path(self, oid: str) -> Path:
+        return self.cache_dir / oid[:2] / oid[2:]
+    
+    def html_path(self, oid: str) -> Path:
+        return self.html_dir / oid[:2] / f"{oid[2:]}.html"
+    
+    def has_body(self, oid: str) -> bool:
+        """Whether the normalized body is cached, i.e. the source blob is no longer needed."""
+        return self.body_path(oid).exists()
+    
+    def has(self, oid: str) -> bool:
+        return self.has_body(oid) and (not self.prerender or self.html_path(oid).exists())
+    
+    def prepare(self, oids: Iterable[str]) -> int:
+        """Normalize (and prerender) every source blob that has no cached output yet."""
+        missing = [oid for oid in set(oids) if not self.has(oid)]
+        if not missing:
+            return 0
+        
+        jobs = {}
+        for oid in missing:
+            has_body = self.has_body(oid)
+            jobs[oid] = (
+                "" if has_body else str(self.object_store.object_path(oid)),
+                str(self.body_path(oid)),
+                str(self.html_path(oid)) if self.prerender else ""
+            )
+        if self.pool is None and ((os.cpu_count() or 1) < 2 or
+                                  sum(os.path.getsize(source or dest)
+                                      for source, dest, _ in jobs.values()) < self.INLINE_BYTES):
+            transform_markdown(list(jobs.values()))
+        else:
+            with self.lock:
+                if self.pool is None:
+                    self.pool = process_pool(self.workers)
+                # Versions sharing a blob wait on the same transform
+                futures = {self.pending[oid] for oid in missing if oid in self.pending}
+                queued = [oid for oid in missing if oid not in self.pending]
+                for start in range(0, len(queued), self.CHUNK_SIZE):
+                    chunk = queued[start:start + self.CHUNK_SIZE]
+                    future = self.pool.submit(transform_markdown, [jobs[oid] for oid in chunk])
+                    futures.add(future)
+                    self.pending.update((oid, future) for oid in chunk)
+            try:
+                for future in futures:
+                    future.result()
+            finally:
+                with self.lock:
+                    for oid in missing:
+                        if oid in self.pending and self.pending[oid].done():
+                            del self.pending[oid]
+        
+        if self.metrics:
+            self.metrics.count("transforms", len(missing))
+        return len(missing)
+    
+    def page_key(self, oid: str) -> str:
+        """Object store key of the page built from a source blob."""
+        return hashlib.sha1(f"page/{self.revision}/{oid}".encode()).hexdigest()
+    
+    def build_page(self, oid: str) -> bytes:
+        """Build the page Jekyll renders from a transformed blob."""
+        body = self.body_path(oid).read_bytes().decode("utf-8", "surrogateescape")
+        front_matter, text = split_front_matter(body)
+        # Pages are plain Markdown; Liquid-looking text in them is not a template
+        fields = {"render_with_liquid": False}
+        if self.prerender:
+            html = self.html_path(oid).read_bytes().decode("utf-8", "surrogateescape")
+            body = f'{front_matter}<div class="prerendered" markdown="0">\n{html}\n</div>\n'
+            text = SearchIndexer.html_text(html)
+            fields["prerendered"] = True
+        title = SearchIndexer.page_title(front_matter, text, "")
+        if title:
+            fields["title"] = title
+        return add_front_matter(body, fields).encode("utf-8", "surrogateescape")
+    
+    def write_page(self, oid: str, target: Path) -> int:
+        """Link the page built from a blob at target, returning its size."""
+        # Pages depend only on their blob, so every version carrying it shares one stored copy
+        key = self.page_key(oid)
+        if not self.object_store.has(key):
+            data = self.build_page(oid)
+            self.object_store.write(key, lambda dest: dest.write(data))
+        return self.object_store.materialize(key, "100644", target)
+    
+    def prune(self, live_oids: Set[str]) -> int:
+        """Drop cached output for blobs no synced page uses, and stale revisions."""
+        removed = 0
+        if not self.root.is_dir():
+            return removed
+        live_dirs = {self.cache_dir, self.html_dir} if self.prerender else {self.cache_dir}
+        for revision_dir in self.root.iterdir():
+            if revision_dir not in live_dirs:
+                shutil.rmtree(revision_dir, ignore_errors=True)
+        for body_path in self.cache_dir.glob("*/*"):
+            if body_path.parent.name + body_path.name not in live_oids:
+                body_path.unlink()
+                removed += 1
+        if self.prerender:
+            for html_path in self.html_dir.glob("*/*.html"):
+                if html_path.parent.name + html_path.name[:-len(".html")] not in live_oids:
+                    html_path.unlink()
+                    removed += 1
+        return removed
+    
+    def close(self):
+        with self.lock:
+            if self.pool:
+                self.pool.shutdown()
+                self.pool = None
+
+
+def docs_tree_key(revision: int, record: Dict) -> str:
+    """Identify the docs a derived file was built from: its builder revision, trees and page transform."""
+    trees = ",".join(f"{name}:{oid}" for name, oid in sorted(record["trees"].items()))
+    return f"r{revision}/t{record.get('transform')}/{trees}"
+
+
+class SearchIndexer:
+    """Prebuilt client-side search index, one per synced version.
+    
+    assets/search/<version>/ holds docs.json (document id -> url and title),
+    manifest.json, and shards/<prefix>.json files that map each term to
+    [[doc_id, [positions]], ...]. Terms are sharded by their first two
+    characters, so a query only fetches the shards of its own terms.
+    """
+    
+    # Bump when tokenization or the file layout changes so every index is rebuilt
+    REVISION = 1
+    PREFIX_LENGTH = 2
+    MIN_TERM_LENGTH = 2
+    TOKEN_RE = re.compile(r"\w+")
+    LINK_TARGET_RE = re.compile(r"\]\([^)]*\)")
+    HTML_HEADING_RE = re.compile(r"<h[1-6][^>]*>(.*?)</h[1-6]>", re.DOTALL)
+    HTML_TAG_RE = re.compile(r"<[^>]+>")
+    SHARD_NAME_RE = re.compile(r"[a-z0-9]+")
+    
+    def __init__(self, root: Path, docs_dir: Path, collection_prefix: str = ""):
+        self.root = root
+        self.docs_dir = docs_dir
+        self.collection_prefix = collection_prefix
+    
+    def shard_name(self, term: str) -> str:
+        prefix = term[:self.PREFIX_LENGTH]
+        # Keep shard file names portable; rarer scripts share one shard
+        return prefix if self.SHARD_NAME_RE.fullmatch(prefix) else "_"
+    
+    def is_current(self, version_key: str, key: str) -> bool:
+        try:
+            with open(self.root / version_key / "manifest.json") as f:
+                return json.load(f).get("key") == key
+        except (OSError, json.JSONDecodeError):
+            return False
+    
+    @staticmethod
+    def page_title(front_matter: str, body: str, fallback: str) -> str:
+        match = re.search(r"^title:\s*(.+?)\s*$", front_matter, re.MULTILINE)
+        if match:
+            return match[1].strip("\"'")
+        match = re.search(r"^#{1,6}\s+(.+?)\s*#*\s*$", body, re.MULTILINE)
+        # Show link text, not Markdown link syntax
+        return re.sub(r"\[([^\]]*)\]\([^)]*\)", r"\1", match[1]) if match else fallback
+    
+    @classmethod
+    def html_text(cls, html: str) -> str:
+        """Text of a prerendered page, with headings kept as '# ' lines for page_title."""
+        html = cls.HTML_HEADING_RE.sub(lambda m: f"\n# {cls.HTML_TAG_RE.sub('', m[1])}\n", html)
+        return unescape(cls.HTML_TAG_RE.sub(" ", html))
+    
+    def build(self, version_key: str, key: str) -> int:
+        """Index every page of _docs/<version> and publish it, returning the page count."""
+        version_dir = self.docs_dir / version_key
+        documents = []
+        postings = {}
+        
+        for page in sorted(version_dir.rglob("*.md")):
+            if not page.is_file():
+                continue
+            relative = page.relative_to(version_dir).with_suffix("").as_posix()
+            front_matter, body = split_front_matter(page.read_text(errors="replace"))
+            if re.search(r"^prerendered:\s*true\s*$", front_matter, re.MULTILINE):
+                body = self.html_text(body)
+            doc_id = len(documents)
+            documents.append({
+                "url": f"/docs/{self.collection_prefix}{version_key}/{relative}",
+                "title": self.page_title(front_matter, body, page.stem)
+            })
+            
+            # Group positions per page first; most terms repeat within a page
+            positions = {}
+            for position, term in enumerate(self.TOKEN_RE.findall(self.LINK_TARGET_RE.sub("]", body).lower())):
+                if term in positions:
+                    positions[term].append(position)
+                else:
+                    positions[term] = [position]
+            for term, term_positions in positions.items():
+                if len(term) >= self.MIN_TERM_LENGTH:
+                    postings.setdefault(term, {})[doc_id] = term_positions
+        
+        shards = {}
+        for term in sorted(postings):
+            shards.setdefault(self.shard_name(term), {})[term] = [
+                [doc_id, positions] for doc_id, positions in postings[term].items()
+            ]
+        
+        # Build next to the live index and swap it in, so readers never see half an index
+        # (json.dumps rather than json.dump: only the former uses the C encoder)
+        self.root.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(dir=self.root, prefix=f".{version_key}-"))
+        # mkdtemp creates the directory private to its owner, which a web server cannot read
+        os.chmod(staging, 0o755)
+        try:
+            (staging / "shards").mkdir()
+            for name, terms in shards.items():
+                (staging / "shards" / f"{name}.json").write_text(json.dumps(terms, separators=(",", ":")))
+            (staging / "docs.json").write_text(json.dumps(documents, separators=(",", ":")))
+            with open(staging / "manifest.json", "w") as f:
+                json.dump({
+                    "version": version_key,
+                    "key": key,
+                    "prefix_length": self.PREFIX_LENGTH,
+                    "documents": len(documents),
+                    "terms": len(postings),
+                    "shards": sorted(shards)
+                }, f, indent=2)
+            
+            target = self.root / version_key
+            if target.exists():
+                retired = self.root / f".{version_key}-old"
+                shutil.rmtree(retired, ignore_errors=True)
+                target.rename(retired)
+                staging.rename(target)
+                shutil.rmtree(retired)
+            else:
+                staging.rename(target)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        return len(documents)
+    
+    def update(self, synced: Dict[str, Dict], force: bool = False) -> int:
+        """Re-index versions whose docs changed; returns how many were rebuilt."""
+        rebuilt = 0
+        for version_key, record in synced.items():
+            key = docs_tree_key(self.REVISION, record)
+            if not force and self.is_current(version_key, key):
+                continue
+            pages = self.build(version_key, key)
+            print(f"✓ Indexed {pages} pages of version {version_key} for search")
+            rebuilt += 1
+        self.prune(set(synced))
+        return rebuilt
+    
+    def prune(self, keep: Set[str]):
+        """Remove indexes of versions that are no longer synced, and leftover staging dirs."""
+        if not self.root.is_dir():
+            return
+        for entry in self.root.iterdir():
+            # Other sources' indexes may be nested here; only version indexes have a manifest
+            if entry.is_dir() and entry.name not in keep and (
+                    entry.name.startswith(".") or (entry / "manifest.json").exists()):
+                shutil.rmtree(entry, ignore_errors=True)
+
+
+class DocsNavigation:
+    """Precomputed navigation for each synced version, published as Jekyll data.
+    
+    _data/docs_nav/<version>.json holds the version's page tree (one node per
+    doc directory, titled by its index page), and per page URL the page title
+    with its prev/next neighbours in reading order. Layouts look navigation up
+    with site.data.docs_nav[version] instead of looping over site.docs on
+    every page. Pages sort by a nav_order front matter field, then index
+    pages first, then by file name.
+    
+    Jekyll drops dots from data file and directory names when it loads them
+    ("0.4.json" becomes "04"), so names are written with underscores ("0_4")
+    and the layout looks them up the same way.
+    """
+    
+    # Bump when the data layout or ordering changes so every file is rebuilt
+    REVISION = 1
+    INDEX_NAMES = ("index", "readme")
+    
+    def __init__(self, root: Path, docs_dir: Path, collection_prefix: str = ""):
+        self.root = root
+        self.docs_dir = docs_dir
+        self.collection_prefix = collection_prefix
+    
+    @staticmethod
+    def data_name(name: str) -> str:
+        """Data file or directory name that keeps its own key in site.data."""
+        return name.replace(".", "_")
+    
+    def data_path(self, version_key: str) -> Path:
+        return self.root / f"{self.data_name(version_key)}.json"
+    
+    def load(self, version_key: str) -> Dict:
+        try:
+            with open(self.data_path(version_key)) as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+    
+    def page_entry(self, page: Path, url: str) -> Dict:
+        front_matter, body = split_front_matter(page.read_text(errors="replace"))
+        if re.search(r"^prerendered:\s*true\s*$", front_matter, re.MULTILINE):
+            body = SearchIndexer.html_text(body)
+        match = re.search(r"^nav_order:\s*(-?\d+)\s*$", front_matter, re.MULTILINE)
+        return {
+            "title": SearchIndexer.page_title(front_matter, body, page.stem.replace("-", " ").title()),
+            "url": url,
+            "order": int(match[1]) if match else None
+        }
+    
+    def sort_key(self, node: Dict) -> tuple:
+        return (node["order"] is None, node["order"] or 0, node["name"].lower() not in self.INDEX_NAMES,
+                node["name"].lower())
+    
+    def walk(self, directory: Path, url: str) -> Dict:
+        """Build the node of one directory: its index page's title and URL, and its children."""
+        children = []
+        index = None
+        for entry in directory.iterdir():
+            if entry.name.startswith("."):
+                continue
+            if entry.is_dir():
+                node = self.walk(entry, f"{url}/{entry.name}")
+                if node["children"] or node["url"]:
+                    children.append(node)
+            elif entry.suffix.lower() == ".md" and entry.is_file():
+                node = {"name": entry.stem, **self.page_entry(entry, f"{url}/{entry.stem}")}
+                if entry.stem.lower() in self.INDEX_NAMES and index is None:
+                    index = node
+                else:
+                    children.append(node)
+        children.sort(key=self.sort_key)
+        
+        return {
+            "name": directory.name,
+            "title": index["title"] if index else directory.name.replace("-", " ").title(),
+            "url": index["url"] if index else None,
+            "order": index["order"] if index else None,
+            "children": children
+        }
+    
+    def build(self, version_key: str, dir_names: List[str]) -> Dict:
+        """Walk _docs/<version> once and return its tree and per-page prev/next links."""
+        version_dir = self.docs_dir / version_key
+        base = f"/docs/{self.collection_prefix}{version_key}"
+        sections = [
+            self.walk(version_dir / name, f"{base}/{name}")
+            for name in dir_names if (version_dir / name).is_dir()
+        ]
+        sections = [section for section in sections if section["children"] or section["url"]]
+        sections.sort(key=self.sort_key)
+        
+        reading_order = []
+        
+        def strip(node: Dict) -> Dict:
+            # Reading order is depth-first: a directory's index page, then its children
+            if node["url"]:
+                reading_order.append(node)
+            stripped = {"title": node["title"], "url": node["url"]}
+            if "children" in node:
+                stripped["children"] = [strip(child) for child in node["children"]]
+            return stripped
+        
+        tree = [strip(section) for section in sections]
+        pages = {}
+        for position, node in enumerate(reading_order):
+            previous = reading_order[position - 1] if position else None
+            following = reading_order[position + 1] if position + 1 < len(reading_order) else None
+            pages[node["url"]] = {
+                "title": node["title"],
+                "prev": {"title": previous["title"], "url": previous["url"]} if previous else None,
+                "next": {"title": following["title"], "url": following["url"]} if following else None
+            }
+        return {"tree": tree, "pages": pages}
+    
+    def update(self, synced: Dict[str, Dict], force: bool = False) -> List[str]:
+        """Rebuild the navigation of versions whose docs changed; returns those whose navigation differs.
+        
+        Jekyll's incremental build does not track data files, so the caller
+        must mark every page of the returned versions for re-rendering.
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        changed = []
+        for version_key, record in synced.items():
+            key = docs_tree_key(self.REVISION, record)
+            previous = self.load(version_key)
+            if not force and previous.get("key") == key:
+                continue
+            navigation = self.build(version_key, sorted(record["trees"]))
+            data = {"version": version_key, "key": key, **navigation}
+            fd, temp_path = tempfile.mkstemp(dir=self.root, prefix=".tmp-nav-")
+            with os.fdopen(fd, "w") as f:
+                f.write(json.dumps(data, separators=(",", ":")))
+            # mkstemp files are private to their owner
+            os.chmod(temp_path, 0o644)
+            os.replace(temp_path, self.data_path(version_key))
+            if {"tree": previous.get("tree"), "pages": previous.get("pages")} != navigation:
+                changed.append(version_key)
+        self.prune({self.data_name(version_key) for version_key in synced})
+        return changed
+    
+    def prune(self, keep: Set[str]):
+        """Remove navigation of versions that are no longer synced (keep holds data names)."""
+        for entry in self.root.glob("*.json"):
+            if entry.stem not in keep:
+                entry.unlink()
+        for entry in self.root.glob(".tmp-nav-*"):
+            entry.unlink()
+
+
+class LinkChecker:
+    """Validates internal links across every synced version of the docs.
+    
+    One pass over _docs builds the set of site paths the collection serves;
+    each link is then a set lookup. Extracted links are cached per file,
+    keyed by inode, size and mtime, so only pages whose content changed are
+    re-read. Cached links are still resolved against the fresh path index,
+    which catches links broken by pages removed elsewhere.
+    """
+    
+    # Pages are parsed in the process pool only when there is this much to read
+    INLINE_BYTES = 4 * 1024 * 1024
+    
+    def __init__(self, docs_dir: Path, cache_file: Path, workers: int = 4, collection_prefix: str = ""):
+        self.docs_dir = docs_dir
+        self.cache_file = cache_file
+        self.workers = max(workers, 1)
+        # Where docs_dir sits in the collection, for sources synced below _docs/
+        self.collection_prefix = collection_prefix
+        self.files_parsed = 0
+    
+    def scan(self) -> tuple:
+        """Walk _docs once, returning (served path keys, {page: stat key})."""
+        served = set()
+        pages = {}
+        linked = set()
+        for root, dirs, files in os.walk(self.docs_dir, followlinks=True):
+            dirs[:] = [name for name in dirs if not name.startswith(".")]
+            relative_root = Path(root).relative_to(self.docs_dir).as_posix()
+            # Pages reached through a symlinked dir are served but not checked twice
+            for name in dirs:
+                if relative_root in linked or os.path.islink(os.path.join(root, name)):
+                    linked.add(name if relative_root == "." else f"{relative_root}/{name}")
+            for name in files:
+                if name.startswith("."):
+                    continue
+                relative_path = name if relative_root == "." else f"{relative_root}/{name}"
+                served.add(link_key(page_url(self.collection_prefix + relative_path)))
+                if name.lower().endswith(".md") and relative_root not in linked:
+                    stat = (self.docs_dir / relative_path).stat()
+                    pages[relative_path] = [stat.st_ino, stat.st_size, stat.st_mtime_ns]
+        return served, pages
+    
+    def load_cache(self) -> Dict:
+        try:
+            with open(self.cache_file) as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+    
+    def extract(self, relative_paths: List[str], sizes: int) -> Dict[str, List]:
+        """Extract links of the given pages, one process pool task per version."""
+        by_version = {}
+        for relative_path in relative_paths:
+            by_version.setdefault(relative_path.split("/", 1)[0], []).append(
+                (str(self.docs_dir / relative_path), self.collection_prefix + relative_path)
+            )
+        
+        if sizes < self.INLINE_BYTES or len(by_version) < 2 or (os.cpu_count() or 1) < 2:
+            results = [extract_links_batch(jobs) for jobs in by_version.values()]
+        else:
+            with process_pool(min(self.workers, len(by_version))) as pool:
+                results = list(pool.map(extract_links_batch, by_version.values()))
+        prefix_length = len(self.collection_prefix)
+        return {url_path[prefix_length:]: links for batch in results for url_path, links in batch}
+    
+    def check(self) -> List[tuple]:
+        """Return broken links as (page, target), refreshing the link cache."""
+        served, pages = self.scan()
+        cached = self.load_cache().get("pages", {})
+        
+        changed = [
+            relative_path for relative_path, stat_key in pages.items()
+            if cached.get(relative_path, {}).get("stat") != stat_key
+        ]
+        extracted = self.extract(changed, sum(pages[path][1] for path in changed))
+        self.files_parsed = len(changed)
+        
+        entries = {}
+        broken = []
+        for relative_path, stat_key in pages.items():
+            links = extracted[relative_path] if relative_path in extracted else cached[relative_path]["links"]
+            entries[relative_path] = {"stat": stat_key, "links": links}
+            for target, key in links:
+                # Only the docs collection is indexed; other site pages are not checked
+                if not key.startswith(f"/docs/{self.collection_prefix}"):
+                    continue
+                if key not in served and f"{key}/index" not in served:
+                    broken.append((relative_path, target))
+        
+        if changed or len(pages) != len(cached):
+            try:
+                with open(self.cache_file, "w") as f:
+                    f.write(json.dumps({"pages": entries}, separators=(",", ":")))
+            except IOError:
+                print("⚠ Warning: Could not save link check cache")
+        return broken
+
+
+class ChangeManifest:
+    """Added, modified and deleted paths under _docs/ for the next site build.
+    
+    The manifest accumulates across syncs until a build consumes (deletes)
+    it, so syncing twice before building loses nothing: a page added and
+    then deleted in between drops out, a page deleted and re-added becomes
+    modified.
+    
+    In multi-source mode every source merges its changes into the one
+    manifest at _docs/.sync_manifest.json. docs_dir is the source's target,
+    whose children are its versions, and docs_dirs lists every source's
+    target so the versions of the other sources' paths can be told apart.
+    """
+    
+    KINDS = ("added", "modified", "deleted")
+    # Sources sharing a manifest merge into it one at a time
+    write_lock = threading.Lock()
+    
+    def __init__(self, path: Path, docs_dir: Optional[Path] = None, docs_dirs: Iterable[Path] = ()):
+        self.path = path
+        self.docs_dir = docs_dir or path.parent
+        # Innermost first, so a path is claimed by the source nested deepest
+        self.docs_dirs = sorted({self.docs_dir, *docs_dirs}, key=lambda d: len(d.parts), reverse=True)
+        self.lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        self.changes = {}
+        self.latest = None
+    
+    def record(self, path: Path, kind: str):
+        with self.lock:
+            self.changes[path.as_posix()] = kind
+    
+    def record_touched(self, path: Path):
+        """Record a page that must be re-rendered although its source did not change."""
+        with self.lock:
+            self.changes.setdefault(path.as_posix(), "modified")
+    
+    def record_latest(self, previous: Optional[str], current: str):
+        # 'latest' can move more than once per run; previous is where it started
+        if self.latest:
+            previous = self.latest["previous"]
+        self.latest = {"previous": previous, "current": current}
+    
+    def snapshot(self) -> Dict:
+        with self.lock:
+            return {"changes": dict(self.changes), "latest": self.latest}
+    
+    def restore(self, state: Dict):
+        """Pick up the changes an interrupted run recorded (see SyncJournal)."""
+        with self.lock:
+            self.changes.update(state.get("changes", {}))
+            self.latest = state.get("latest") or self.latest
+    
+    @staticmethod
+    def combine(previous: Optional[str], kind: str) -> Optional[str]:
+        """Fold a new change into one the last build has not seen yet."""
+        if previous is None:
+            return kind
+        if previous == "added":
+            return None if kind == "deleted" else "added"
+        return "deleted" if kind == "deleted" else "modified"
+    
+    @staticmethod
+    def load(path: Path) -> Dict:
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+    
+    def locate(self, path: str) -> Optional[tuple]:
+        """The target a path under _docs/ belongs to and its version, named relative to the manifest."""
+        path = Path(path)
+        for docs_dir in self.docs_dirs:
+            if path.is_relative_to(docs_dir):
+                relative = path.relative_to(docs_dir)
+                if len(relative.parts) < 2:
+                    return None
+                return docs_dir, (docs_dir.relative_to(self.path.parent) / relative.parts[0]).as_posix()
+        return None
+    
+    def write(self, versions: List[str]) -> Dict:
+        """Merge this run's changes into the pending manifest and write it."""
+        with self.write_lock:
+            pending = self.load(self.path)
+            # Sources used to write a manifest of their own that no build read; fold it in and drop it
+            stale_path = self.docs_dir / ".sync_manifest.json"
+            stale = self.load(stale_path) if stale_path != self.path else {}
+            merged = {
+                path: kind for manifest in (stale, pending) for kind in self.KINDS for path in manifest.get(kind, [])
+            }
+            for path, kind in self.changes.items():
+                merged_kind = self.combine(merged.pop(path, None), kind)
+                if merged_kind:
+                    merged[path] = merged_kind
+            
+            touched = {located[1] for located in map(self.locate, merged) if located}
+            # Other sources' versions are kept as they last wrote them; this source's are replaced
+            prefix = self.docs_dir.relative_to(self.path.parent)
+            listed = [(prefix / version).as_posix() for version in versions]
+            pending_versions = pending.get("versions", {})
+            for version in pending_versions.get("touched", []) + pending_versions.get("unchanged", []):
+                located = self.locate((self.path.parent / version / "index.md").as_posix())
+                if located and located[0] != self.docs_dir and version not in listed:
+                    listed.append(version)
+            
+            manifest = {
+                "generated": datetime.now().astimezone().isoformat(),
+                "syncs": pending.get("syncs", 0) + 1,
+                "versions": {
+                    "touched": [version for version in listed if version in touched]
+                               + sorted(touched.difference(listed)),
+                    "unchanged": [version for version in listed if version not in touched]
+                },
+                "latest": pending.get("latest")
+            }
+            if pending.get("latest_by_source"):
+                manifest["latest_by_source"] = pending["latest_by_source"]
+            # 'previous' is where latest pointed at the last build
+            if self.latest:
+                if prefix == Path("."):
+                    manifest["latest"] = self.merge_latest(pending.get("latest"))
+                else:
+                    by_source = manifest.setdefault("latest_by_source", {})
+                    by_source[prefix.as_posix()] = self.merge_latest(by_source.get(prefix.as_posix()))
+            for kind in self.KINDS:
+                manifest[kind] = sorted(path for path, merged_kind in merged.items() if merged_kind == kind)
+            
+            fd, temp_path = tempfile.mkstemp(dir=self.path.parent, prefix=".tmp-manifest-")
+            with os.fdopen(fd, "w") as f:
+                f.write(json.dumps(manifest, indent=2))
+            os.chmod(temp_path, 0o644)
+            os.replace(temp_path, self.path)
+            if stale_path != self.path and stale_path.exists():
+                stale_path.unlink()
+        return manifest
+    
+    def merge_latest(self, pending: Optional[Dict]) -> Dict:
+        if pending:
+            return {"previous": pending["previous"], "current": self.latest["current"]}
+        return self.latest
+
+
+class SyncJournal:
+    """On-disk record of the versions the current run has completed.
+    
+    Rewritten each time a version lands and removed once the run has saved
+    its cache, so it only survives a run that was cancelled or crashed. The
+    next run folds its versions into the cache and replays its change
+    manifest entries, then syncs only the versions that did not complete.
+    """
+    
+    def __init__(self, path: Path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.versions = {}
+    
+    def load(self) -> Dict:
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+    
+    def start(self, versions: Dict[str, Dict]):
+        # Versions resumed from an earlier journal stay in it in case this run is interrupted too
+        with self.lock:
+            self.versions = dict(versions)
+    
+    def complete(self, version_key: str, record: Dict):
+        with self.lock:
+            self.versions[version_key] = record
+    
+    def write(self, changes: ChangeManifest):
+        with self.lock:
+            data = json.dumps({"versions": self.versions, **changes.snapshot()}, separators=(",", ":"))
+            fd, temp_path = tempfile.mkstemp(dir=self.path.parent, prefix=".tmp-journal-")
+            with os.fdopen(fd, "w") as f:
+                f.write(data)
+            os.chmod(temp_path, 0o644)
+            os.replace(temp_path, self.path)
+    
+    def clear(self):
+        with self.lock:
+            self.versions = {}
+            if self.path.exists():
+                self.path.unlink()
+
+
+class VersionChanges:
+    """"Changes since X.Y" pages for each adjacent pair of synced versions.
+    
+    A pair's change list comes from one `git diff-tree -M` between the two
+    tags' docs trees and is cached by tag pair, so each diff runs once. Pages
+    are only rewritten when their content changes.
+    """
+    
+    REVISION = 2
+    DIRS = ["spec", "stdlib"]
+    SECTIONS = [("A", "Added"), ("M", "Modified"), ("R", "Renamed"), ("D", "Deleted")]
+    PAGE_GLOB = "changes-since-*.md"
+    
+    def __init__(self, docs_dir: Path, cache_file: Path, diff: Callable[[str, str, List[str]], List[tuple]],
+                 dirs: Optional[List[str]] = None, collection_prefix: str = ""):
+        self.docs_dir = docs_dir
+        self.cache_file = cache_file
+        self.diff = diff
+        self.dirs = dirs or self.DIRS
+        self.collection_prefix = collection_prefix
+        self.diffs_computed = 0
+    
+    def page_path(self, version_key: str, since_key: str) -> Path:
+        return self.docs_dir / version_key / f"changes-since-{since_key}.md"
+    
+    def load_cache(self) -> Dict:
+        try:
+            with open(self.cache_file) as f:
+                cache = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+        return cache.get("pairs", {}) if cache.get("revision") == self.REVISION else {}
+    
+    def link(self, version_key: str, path: str) -> str:
+        relative_path = path.split("/", 1)[1]
+        return f"[{relative_path}]({page_url(f'{self.collection_prefix}{version_key}/{relative_path}')})"
+    
+    def render(self, version_key: str, since_key: str, record: Dict, since: Dict, changes: List[List[str]]) -> str:
+        by_status = {status: [] for status, _ in self.SECTIONS}
+        for status, old_path, new_path in changes:
+            # Copies read as new pages; type changes as modifications
+            status = {"C": "A", "T": "M"}.get(status, status)
+            if status in by_status:
+                by_status[status].append((old_path, new_path))
+        
+        counts = ", ".join(f"{len(by_status[status])} {title.lower()}" for status, title in self.SECTIONS)
+        lines = [
+            "---",
+            "layout: page",
+            f'title: "Changes in {version_key} since {since_key}"',
+            f'version: "{version_key}"',
+            "---",
+            "",
+            f"Documentation changes between `{since['tag']}` and `{record['tag']}`: {counts}.",
+            ""
+        ]
+        for dir_name in self.dirs:
+            in_dir = {
+                status: [entry for entry in entries if entry[1].startswith(f"docs/{dir_name}/")]
+                for status, entries in by_status.items()
+            }
+            lines.append(f"## {dir_name}")
+            lines.append("")
+            if not any(in_dir.values()):
+                lines.extend(["No changes.", ""])
+                continue
+            for status, title in self.SECTIONS:
+                if not in_dir[status]:
+                    continue
+                lines.extend([f"### {title}", ""])
+                for old_path, new_path in sorted(in_dir[status], key=lambda entry: entry[1]):
+                    if status == "R":
+                        item = f"{self.link(since_key, old_path)} → {self.link(version_key, new_path)}"
+                    elif status == "D":
+                        item = self.link(since_key, old_path)
+                    else:
+                        item = self.link(version_key, new_path)
+                    lines.append(f"- {item}")
+                lines.append("")
+        return "\n".join(lines)
+    
+    def update(self, synced: Dict[str, Dict]) -> Dict[str, List[Path]]:
+        """Write the page of every adjacent pair in synced (newest first) and drop stale ones.
+        
+        Returns the pages added, modified and deleted.
+        """
+        cached = self.load_cache()
+        pairs = {}
+        pages = {"added": [], "modified": [], "deleted": []}
+        self.diffs_computed = 0
+        
+        version_keys = list(synced)
+        for version_key, since_key in zip(version_keys, version_keys[1:]):
+            record, since = synced[version_key], synced[since_key]
+            if not record.get("commit") or not since.get("commit"):
+                continue
+            pair_key = f"{since['tag']}..{record['tag']}"
+            entry = cached.get(pair_key)
+            # A re-pointed tag (or a different set of diffed dirs) invalidates the pair
+            if not entry or entry["commits"] != [since["commit"], record["commit"]] or entry["dirs"] != self.dirs:
+                changes = self.diff(since["commit"], record["commit"], self.dirs)
+                entry = {
+                    "commits": [since["commit"], record["commit"]],
+                    "dirs": self.dirs,
+                    "changes": [[status, old_path, new_path] for status, old_path, new_path, _, _ in changes]
+                }
+                self.diffs_computed += 1
+            pairs[pair_key] = entry
+            
+            page = self.page_path(version_key, since_key)
+            content = self.render(version_key, since_key, record, since, entry["changes"])
+            exists = page.exists()
+            if not exists or page.read_text() != content:
+                page.parent.mkdir(parents=True, exist_ok=True)
+                page.write_text(content)
+                pages["modified" if exists else "added"].append(page)
+        
+        current = {
+            self.page_path(version_key, since_key) for version_key, since_key in zip(version_keys, version_keys[1:])
+        }
+        for version_key in version_keys:
+            for page in (self.docs_dir / version_key).glob(self.PAGE_GLOB):
+                if page not in current:
+                    page.unlink()
+                    pages["deleted"].append(page)
+        
+        if self.diffs_computed or set(pairs) != set(cached):
+            try:
+                with open(self.cache_file, "w") as f:
+                    f.write(json.dumps({"revision": self.REVISION, "pairs": pairs}, separators=(",", ":")))
+            except IOError:
+                print("⚠ Warning: Could not save version diff cache")
+        return pages
+
+
+class LatestAlias:
+    """_docs/latest/ as one static redirect stub per page of the newest version.
+    
+    A symlink made Jekyll render the newest version a second time, and safe
+    mode skips it altogether. Stubs are plain HTML without front matter, so
+    Jekyll copies them without rendering anything. Redirects are relative,
+    which keeps them right under any baseurl or source prefix, and the
+    current version is kept in latest/.version.
+    """
+    
+    STUB = (
+        '<!DOCTYPE html>\n'
+        '<html lang="en">\n'
+        '<meta charset="utf-8">\n'
+        '<title>Redirecting to {version} documentation</title>\n'
+        '{canonical}'
+        '<meta name="robots" content="noindex">\n'
+        '<meta http-equiv="refresh" content="0; url={target}">\n'
+        '<script>location.replace("{target}" + location.search + location.hash)</script>\n'
+        '<p><a href="{target}">Continue to the {version} documentation</a></p>\n'
+        '</html>\n'
+    )
+    
+    def __init__(self, docs_dir: Path, site_url: str = "", collection_prefix: str = ""):
+        self.root = docs_dir / "latest"
+        self.docs_dir = docs_dir
+        self.site_url = site_url.rstrip("/")
+        self.collection_prefix = collection_prefix
+        self.version_file = self.root / ".version"
+    
+    def current(self) -> Optional[str]:
+        if self.root.is_symlink():
+            return os.readlink(self.root)
+        try:
+            return self.version_file.read_text().strip() or None
+        except OSError:
+            return None
+    
+    def page_index(self, version_key: str) -> List[str]:
+        """Paths of every page of a version, relative to its directory."""
+        version_dir = self.docs_dir / version_key
+        pages = []
+        for root, dirs, files in os.walk(version_dir):
+            dirs[:] = [name for name in dirs if not name.startswith(".")]
+            relative_root = Path(root).relative_to(version_dir).as_posix()
+            pages.extend(
+                name if relative_root == "." else f"{relative_root}/{name}"
+                for name in files if name.lower().endswith(".md") and not name.startswith(".")
+            )
+        return pages
+    
+    def stub(self, version_key: str, page: str) -> tuple:
+        """(stub path relative to latest/, stub HTML) for one page."""
+        page_path = PurePosixPath(page[:-3])
+        if page_path.name == "index":
+            # Served as a directory: /docs/latest/<dir>/ -> ../<version>/<dir>/
+            stub_path = str(page_path.with_suffix(".html"))
+            target = "../" * len(page_path.parts) + f"{version_key}/" + "".join(
+                f"{part}/" for part in page_path.parts[:-1]
+            )
+            url = f"/docs/{self.collection_prefix}{version_key}/" + "".join(
+                f"{part}/" for part in page_path.parts[:-1]
+            )
+        else:
+            # Served without the extension: /docs/latest/<dir>/<page> -> ../<version>/<dir>/<page>
+            stub_path = f"{page_path}.html"
+            target = "../" * len(page_path.parts) + f"{version_key}/{page_path}"
+            url = f"/docs/{self.collection_prefix}{version_key}/{page_path}"
+        canonical = f'<link rel="canonical" href="{self.site_url}{url}">\n' if self.site_url else ""
+        return stub_path, self.STUB.format(version=version_key, target=target, canonical=canonical)
+    
+    def publish(self, version_key: str) -> Dict[str, List[Path]]:
+        """Point latest/ at a version, rewriting only stubs whose target changed."""
+        stubs = dict(self.stub(version_key, page) for page in self.page_index(version_key))
+        changes = {"added": [], "modified": [], "deleted": []}
+        
+        if self.root.is_symlink() or self.root.is_file():
+            self.root.unlink()
+        self.root.mkdir(parents=True, exist_ok=True)
+        
+        existing = set()
+        for root, dirs, files in os.walk(self.root):
+            relative_root = Path(root).relative_to(self.root).as_posix()
+            existing.update(
+                name if relative_root == "." else f"{relative_root}/{name}"
+                for name in files if not name.startswith(".")
+            )
+        
+        for stub_path, content in stubs.items():
+            target = self.root / stub_path
+            if stub_path in existing:
+                if target.read_text() == content:
+                    continue
+                changes["modified"].append(target)
+            else:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                changes["added"].append(target)
+            target.write_text(content)
+        
+        for stub_path in existing.difference(stubs):
+            target = self.root / stub_path
+            target.unlink()
+            changes["deleted"].append(target)
+            parent = target.parent
+            while parent != self.root and not any(parent.iterdir()):
+                parent.rmdir()
+                parent = parent.parent
+        
+        self.version_file.write_text(version_key + "\n")
+        return changes
+
+
+class ProgressivePublisher:
+    """Moves 'latest' and the index as versions land instead of after the slowest one.
+    
+    Versions settle (succeed or fail) in any order. 'latest' goes to the newest
+    successful version once every newer one has settled, so an old version
+    finishing first never takes it over, and the newest release is published
+    without waiting for the tail. The index lists every successful version plus
+    those still pending that the last sync published.
+    """
+    
+    def __init__(self, sync: "OptimizedDocSync", order: List[str], published: List[str]):
+        self.sync = sync
+        self.order = order
+        self.pending = set(order)
+        self.succeeded = set()
+        self.published = set(published)
+        self.latest = None
+        self.listed = None
+        self.lock = threading.Lock()
+    
+    def settle(self, version_key: str, success: bool):
+        with self.lock:
+            self.pending.discard(version_key)
+            if success:
+                self.succeeded.add(version_key)
+            
+            latest = None
+            for candidate in self.order:
+                if candidate in self.pending:
+                    break
+                if candidate in self.succeeded:
+                    latest = candidate
+                    break
+            if latest and latest != self.latest:
+                self.sync.publish_latest(latest)
+                self.latest = latest
+            
+            listed = [
+                candidate for candidate in self.order
+                if candidate in self.succeeded or (candidate in self.pending and candidate in self.published)
+            ]
+            # Nothing is known to be good yet while the first versions are still running;
+            # without an index page the final publish reports it once
+            if self.succeeded and listed != self.listed and (self.sync.docs_dir / "index.md").exists():
+                self.sync.update_index_page(listed)
+                self.listed = listed
+
+
+class VersionPlan:
+    """Files to write and remove to bring one _docs/<version> up to date."""
+    
+    def __init__(self, version_key: str, tag: str, present_dirs: List[str], success: bool,
+                 writes: Dict[str, tuple], deletes: Optional[List[str]] = None,
+                 full: bool = True, summary: str = ""):
+        self.version_key = version_key
+        self.tag = tag
+        self.present_dirs = present_dirs
+        self.success = success
+        self.writes = writes
+        self.deletes = deletes or []
+        self.full = full
+        self.summary = summary
+        self.new_blobs = 0
+        self.record = None
+        # Pipeline bookkeeping for the async engine
+        self.error = None
+        self.remaining = 0
+        self.streamed = False
 
 
 class OptimizedDocSync:
-    def __init__(self, repo_path: Path, max_versions: int = 10, parallel_workers: int = 4):
+    # 'v'-prefixed release tags first, then bare ones
+    TAG_REF_PATTERNS = ["refs/tags/v[0-9]*", "refs/tags/[0-9]*"]
+    REF_FORMAT = "%(refname:short)%00%(objecttype)%00%(objectname)%00%(*objecttype)%00%(*objectname)"
+    
+    def __init__(self, repo_path: Path, max_versions: int = 10, parallel_workers: int = 4,
+                 force: bool = False, git_backend: str = "cat-file", engine: str = "thread",
+                 source_url: Optional[str] = None, transform: bool = True,
+                 docs_dir: Path = Path("_docs"), doc_dirs: Optional[List[str]] = None, tag_prefix: str = "",
+                 object_store: Optional[ObjectStore] = None, worker_slots: Optional[threading.Semaphore] = None,
+                 prerender: bool = False, artifact_cache: Optional[ArtifactCache] = None,
+                 changes: Optional[ChangeManifest] = None):
         self.repo_path = repo_path
         self.max_versions = max_versions
         self.parallel_workers = parallel_workers
-        self.docs_dir = Path("_docs")
+        self.force = force
+        self.engine = engine
+        self.metrics = SyncMetrics()
+        self.resolved = {}
+        self.tags_scanned = 0
+        self.mirror = DocsMirror(repo_path, source_url, self.metrics) if source_url else None
+        self.git_objects = (
+            GitObjectPool(repo_path, parallel_workers, self.metrics) if git_backend == "cat-file" else None
+        )
+        self.docs_dir = docs_dir
+        # Sources synced below _docs/ (multi-source mode) are served under /docs/<prefix>
+        self.collection_prefix = (
+            "" if docs_dir == Path("_docs") else docs_dir.relative_to("_docs").as_posix() + "/"
+        )
         self.cache_file = self.docs_dir / ".sync_cache.json"
-        self.doc_dirs = ["contributor", "spec", "stdlib", "user-manual"]
+        # A shared store is pruned by its owner once every source has linked its files
+        self.owns_object_store = object_store is None
+        self.object_store = object_store or ObjectStore(self.docs_dir / ".objects")
+        self.doc_dirs = doc_dirs or ["contributor", "spec", "stdlib", "user-manual"]
+        self.tag_prefix = tag_prefix
+        self.tag_ref_patterns = [pattern.replace("refs/tags/", f"refs/tags/{tag_prefix}", 1)
+                                 for pattern in self.TAG_REF_PATTERNS]
+        # Caps running version tasks across every source sharing the slots
+        self.worker_slots = worker_slots
+        self.transformer = (
+            MarkdownTransformer(self.docs_dir / ".transformed", self.object_store, parallel_workers,
+                                self.metrics, prerender) if transform else None
+        )
+        self.transform_revision = self.transformer.revision if self.transformer else None
+        # Restores trees from --cache-dir before going to git; evicted by whoever owns the object store
+        self.artifact_cache = artifact_cache
+        # Blob listing of every docs tree seen, by tree OID, relative to the tree
+        self.tree_listings = {}
+        self.search_index = SearchIndexer(Path("assets/search") / self.collection_prefix, self.docs_dir,
+                                          self.collection_prefix)
+        self.navigation = DocsNavigation(
+            Path("_data/docs_nav").joinpath(
+                *(DocsNavigation.data_name(part) for part in PurePosixPath(self.collection_prefix).parts)
+            ),
+            self.docs_dir,
+            self.collection_prefix
+        )
+        self.link_checker = LinkChecker(self.docs_dir, self.docs_dir / ".link_cache.json", parallel_workers,
+                                        self.collection_prefix)
+        self.broken_links = []
+        self.changes = changes or ChangeManifest(self.docs_dir / ".sync_manifest.json")
+        # Versions are built under .staging/ and renamed into place; the journal tracks which landed
+        self.staging_dir = self.docs_dir / ".staging"
+        self.journal = SyncJournal(self.docs_dir / ".sync_journal.json")
+        self.resumed = set()
+        self.latest_alias = LatestAlias(self.docs_dir, self.read_site_url(), self.collection_prefix)
+        self.version_changes = VersionChanges(
+            self.docs_dir, self.docs_dir / ".changes_cache.json", self.diff_docs_trees,
+            None if doc_dirs is None else self.doc_dirs,
+            self.collection_prefix
+        )
+        # Source blob OID of every transformed page, per version
+        self.pages = {}
+        self.synced_versions = []
+    
+    @staticmethod
+    def read_site_url(config_path: Path = Path("_config.yml")) -> str:
+        """Read url + baseurl from the Jekyll config for canonical page URLs."""
+        try:
+            config = config_path.read_text()
+        except OSError:
+            return ""
+        values = {}
+        for key in ("url", "baseurl"):
+            match = re.search(rf"^{key}:\s*[\"']?([^\"'#\s]*)", config, re.MULTILINE)
+            values[key] = match[1] if match else ""
+        return values["url"].rstrip("/") + values["baseurl"].rstrip("/")
         
     def run_git_command(self, command: List[str]) -> str:
         """Run a git command in the repository."""
+        self.metrics.count("subprocesses")
         try:
             result = subprocess.run(
                 ["git"] + command,
@@ -51,48 +2252,108 @@ class OptimizedDocSync:
             print(f"Git command failed: {e}")
             return ""
 
-    def get_git_tags_efficiently(self) -> List[str]:
-        """Get git tags efficiently using git for-each-ref."""
-        # Use git for-each-ref for better performance with many tags
-        output = self.run_git_command([
-            "for-each-ref", 
-            "--format=%(refname:short)",
-            "--sort=-version:refname",  # Sort by version descending
-            "refs/tags"
-        ])
-        if not output:
-            return []
-        return [tag.strip() for tag in output.split('\n') if tag.strip()]
-
-    def parse_and_filter_versions(self, tags: List[str]) -> Dict[str, semver.VersionInfo]:
-        """Parse version tags and filter efficiently."""
-        versions = []
-        
-        # Parse versions in batches to manage memory
-        for tag in tags:
-            version_str = tag[1:] if tag.startswith('v') else tag
-            
-            try:
-                version = semver.VersionInfo.parse(version_str)
-                # Skip pre-release versions
-                if version.prerelease is None:
-                    versions.append(version)
-            except ValueError:
+    def stream_tag_refs(self, pattern: str) -> Iterator[tuple]:
+        """Yield (tag, peeled commit) from a running for-each-ref, newest version first."""
+        self.metrics.count("subprocesses")
+        process = subprocess.Popen(
+            ["git", "for-each-ref", "--sort=-version:refname", f"--format={self.REF_FORMAT}", pattern],
+            cwd=self.repo_path,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+        try:
+            for line in process.stdout:
+                tag, obj_type, oid, peeled_type, peeled_oid = (
+                    line.decode(errors="surrogateescape").rstrip("\n").split("\0")
+                )
+                self.tags_scanned += 1
+                if obj_type == "commit":
+                    yield tag, oid
+                elif peeled_type == "commit":
+                    yield tag, peeled_oid
+                else:
+                    # Tag of a tag; peeled along with the docs trees
+                    yield tag, ""
+        finally:
+            # Stopping early just closes the pipe; nothing more is read from git
+            process.stdout.close()
+            if process.poll() is None:
+                process.terminate()
+            process.wait()
+
+    def tag_for(self, version_key: str, version: ReleaseVersion) -> str:
+        """The tag a selected version was found under."""
+        return self.resolved.get(version_key, {}).get("tag", f"{self.tag_prefix}v{version}")
+
+    def select_streamed_versions(self, refs: Iterable[tuple]) -> Dict[tuple, tuple]:
+        """Pick the newest release of each of the first max_versions minor lines.
+        
+        refs must come in descending version order: the first valid release of a
+        minor line is its newest patch, and reading stops at the first tag of a
+        minor line older than the ones already selected.
+        """
+        selected = {}
+        for tag, commit in refs:
+            # Tags of other components (e.g. "stdlib-v1.2.0" next to "v1.2.0") carry a prefix
+            if not tag.startswith(self.tag_prefix):
+                continue
+            version = parse_release_tag(tag[len(self.tag_prefix):])
+            if version is None:
                 continue
+            minor = (version.major, version.minor)
+            if minor in selected:
+                continue
+            if len(selected) == self.max_versions:
+                break
+            selected[minor] = (version, tag, commit)
+        return selected
+
+    def enumerate_release_tags(self) -> Dict[str, ReleaseVersion]:
+        """Select versions from streamed tag refs, recording each tag's peeled commit."""
+        candidates = {}
+        # 'v'-prefixed and bare tags sort apart under version sort, so stream them separately
+        for pattern in self.tag_ref_patterns:
+            with closing(self.stream_tag_refs(pattern)) as refs:
+                for minor, entry in self.select_streamed_versions(refs).items():
+                    if minor not in candidates or entry[0] > candidates[minor][0]:
+                        candidates[minor] = entry
         
-        # Group by minor version and get latest patch
-        minor_versions = {}
-        for version in versions:
-            minor_key = f"{version.major}.{version.minor}"
-            if minor_key not in minor_versions or version > minor_versions[minor_key]:
-                minor_versions[minor_key] = version
+        versions = {}
+        for version, tag, commit in heapq.nlargest(self.max_versions, candidates.values()):
+            version_key = f"{version.major}.{version.minor}"
+            versions[version_key] = version
+            self.resolved[version_key] = {"tag": tag, "commit": commit}
+        return versions
+
+    def resolve_docs_trees(self):
+        """Resolve peeled commits and docs tree OIDs for all selected tags in one batch."""
+        specs = []
+        for record in self.resolved.values():
+            if not record["commit"]:
+                specs.append(f"{record['tag']}^{{commit}}")
+            rev = record["commit"] or record["tag"]
+            specs.extend(f"{rev}:docs/{dir_name}" for dir_name in self.doc_dirs)
         
-        # Limit to max_versions (most recent)
-        sorted_items = sorted(minor_versions.items(), 
-                            key=lambda x: minor_versions[x[0]], 
-                            reverse=True)
+        self.metrics.count("subprocesses")
+        result = subprocess.run(
+            ["git", "cat-file", "--batch-check"],
+            cwd=self.repo_path,
+            input="\n".join(specs) + "\n",
+            capture_output=True,
+            text=True,
+            check=True
+        )
+        answers = iter(result.stdout.split("\n"))
         
-        return dict(sorted_items[:self.max_versions])
+        for record in self.resolved.values():
+            if not record["commit"]:
+                fields = next(answers).split()
+                record["commit"] = fields[0] if fields[-1] != "missing" else ""
+            record["trees"] = {}
+            for dir_name in self.doc_dirs:
+                fields = next(answers).split()
+                if fields[-1] != "missing" and fields[1] == "tree":
+                    record["trees"][dir_name] = fields[0]
 
     def load_cache(self) -> Dict:
         """Load processing cache to avoid redundant work."""
@@ -104,149 +2365,625 @@ class OptimizedDocSync:
                 pass
         return {}
 
-    def save_cache(self, cache: Dict):
-        """Save processing cache."""
+    def save_cache(self, cache: Dict) -> bool:
+        """Save processing cache, replacing the previous one atomically."""
         try:
-            with open(self.cache_file, 'w') as f:
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_file.parent, prefix=".tmp-cache-")
+            with os.fdopen(fd, "w") as f:
                 json.dump(cache, f, indent=2)
+            os.chmod(temp_path, 0o644)
+            os.replace(temp_path, self.cache_file)
+            return True
         except IOError:
             print("⚠ Warning: Could not save cache")
+            return False
 
-    def get_version_hash(self, version: semver.VersionInfo) -> str:
-        """Get hash of version's documentation for change detection."""
+    def start_git_objects(self, probe_tag: str):
+        """Check that the cat-file backend works, falling back to subprocesses if not."""
+        if not self.git_objects:
+            return
         try:
-            # Get commit hash for the tag
-            tag = f"v{version}"
-            commit_hash = self.run_git_command(["rev-list", "-n", "1", tag])
-            
-            # Create hash based on commit and doc directories
-            content = f"{commit_hash}:{':'.join(self.doc_dirs)}"
-            return hashlib.md5(content.encode()).hexdigest()
-        except:
-            return str(version)
-
-    def extract_docs_with_git_archive(self, version: semver.VersionInfo, version_key: str) -> bool:
-        """Extract documentation using git archive (faster than checkout)."""
-        tag = f"v{version}"
+            with self.git_objects.reader() as reader:
+                reader.info(probe_tag)
+        except (OSError, RuntimeError) as e:
+            print(f"⚠ Warning: git cat-file backend unavailable ({e}), using subprocess backend")
+            self.git_objects.close()
+            self.git_objects = None
+
+    def is_version_intact(self, version_key: str, cached: Optional[Dict]) -> bool:
+        """Check that the output of a previous sync is still on disk."""
+        if not cached or cached.get("transform") != self.transform_revision:
+            return False
         version_dir = self.docs_dir / version_key
+        return all((version_dir / dir_name).is_dir() for dir_name in cached.get("trees", {}))
+
+    def is_version_unchanged(self, version_key: str, trees: Dict[str, str], cache: Dict) -> bool:
+        """Check whether a version's docs trees match the last successful sync."""
+        cached = cache.get("versions", {}).get(version_key)
+        if not cached or cached.get("trees") != trees:
+            return False
+        # Pages synced without (or with an older) Markdown transform must be rebuilt
+        if cached.get("transform") != self.transform_revision:
+            return False
         
-        # Create version directory
-        version_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Remove existing docs
+        # The cache is only trustworthy if the synced output is still on disk
+        version_dir = self.docs_dir / version_key
+        return all((version_dir / dir_name).is_dir() for dir_name in self.doc_dirs)
+
+    def check_present_dirs(self, version_key: str, trees: Dict[str, str]) -> tuple:
+        """Return the doc dirs present at a version and whether all of them are."""
+        present_dirs = [dir_name for dir_name in self.doc_dirs if dir_name in trees]
         for dir_name in self.doc_dirs:
-            target_dir = version_dir / dir_name
-            if target_dir.exists():
-                shutil.rmtree(target_dir)
-        
-        success = True
+            if dir_name not in trees:
+                print(f"⚠ Warning: {dir_name} docs not found for version {version_key}")
+        return present_dirs, len(present_dirs) == len(self.doc_dirs)
+
+    @staticmethod
+    def parse_tree_entries(output: str) -> Dict[str, tuple]:
+        """Parse `git ls-tree -z` output into path -> (mode, type, oid)."""
+        entries = {}
+        for entry in output.split('\0'):
+            if not entry:
+                continue
+            meta, path = entry.split('\t', 1)
+            mode, obj_type, oid = meta.split()
+            entries[path] = (mode, obj_type, oid)
+        return entries
+
+    @staticmethod
+    def parse_diff_tree(output: str) -> List[tuple]:
+        """Parse `git diff-tree -r -z` output into (status, old_path, new_path, mode, oid)."""
+        fields = output.split('\0')
+        changes = []
+        i = 0
+        while i < len(fields) and fields[i]:
+            _, new_mode, _, new_oid, status = fields[i][1:].split()
+            status = status[0]
+            if status in ("R", "C"):
+                old_path, new_path = fields[i + 1], fields[i + 2]
+                i += 3
+            else:
+                old_path = new_path = fields[i + 1]
+                i += 2
+            changes.append((status, old_path, new_path, new_mode, new_oid))
+        return changes
+
+    def diff_tree_args(self, old_commit: str, new_commit: str, dir_names: Optional[List[str]] = None) -> List[str]:
+        return (["diff-tree", "-r", "-z", "-M", "--no-commit-id", old_commit, new_commit, "--"]
+                + [f"docs/{dir_name}" for dir_name in dir_names or self.doc_dirs])
+
+    def diff_docs_trees(self, old_commit: str, new_commit: str,
+                        dir_names: Optional[List[str]] = None) -> List[tuple]:
+        """List changed doc files between two commits as (status, old_path, new_path, mode, oid)."""
+        self.metrics.count("subprocesses")
+        result = subprocess.run(
+            ["git"] + self.diff_tree_args(old_commit, new_commit, dir_names),
+            cwd=self.repo_path,
+            capture_output=True,
+            check=True
+        )
+        return self.parse_diff_tree(result.stdout.decode(errors="surrogateescape"))
+
+    def plan_full(self, version_key: str, tag: str, trees: Dict[str, str],
+                  blobs: Dict[str, tuple]) -> "VersionPlan":
+        """Plan a rebuild of a version from the complete blob listing of its doc dirs."""
+        present_dirs, success = self.check_present_dirs(version_key, trees)
+        writes = {path: entry for path, entry in blobs.items() if ".." not in PurePosixPath(path).parts}
+        return VersionPlan(version_key, tag, present_dirs, success, writes)
+
+    def plan_delta(self, version_key: str, tag: str, trees: Dict[str, str],
+                   changes: List[tuple], old_commit: str, new_commit: str) -> "VersionPlan":
+        """Plan an in-place update of a version from a diff-tree change list."""
+        present_dirs, success = self.check_present_dirs(version_key, trees)
+        writes = {
+            new_path: (mode, oid) for status, _, new_path, mode, oid in changes
+            if status != "D" and mode != "160000" and ".." not in PurePosixPath(new_path).parts
+        }
+        deletes = [old_path for status, old_path, *_ in changes if status in ("D", "R")]
         
-        # Use git archive to extract specific directories
+        counts = {status: 0 for status in "AMDR"}
+        for status, *_ in changes:
+            counts[status] = counts.get(status, 0) + 1
+        summary = (f"{old_commit[:10]}..{new_commit[:10]}: {counts['A']} added, {counts['M']} modified, "
+                   f"{counts['D']} deleted, {counts['R']} renamed")
+        return VersionPlan(version_key, tag, present_dirs, success, writes, deletes, full=False, summary=summary)
+
+    def missing_blobs(self, plan: "VersionPlan") -> Dict[str, tuple]:
+        """Blobs a plan writes that are not in the object store or the transform cache yet."""
+        transformer = self.transformer
+        return {
+            path: (mode, oid) for path, (mode, oid) in plan.writes.items()
+            if not self.object_store.has(oid)
+            and not (transformer and transformer.handles(path, mode) and transformer.has_body(oid))
+        }
+
+    @staticmethod
+    def doc_target(version_dir: Path, path: str) -> Path:
+        """Where a docs/<dir>/... repository path is synced under _docs/<version>."""
+        return version_dir.joinpath(*PurePosixPath(path).parts[1:])
+
+    def existing_doc_files(self, version_dir: Path) -> Set[str]:
+        """Repository paths (docs/<dir>/...) of the files currently synced for a version."""
+        existing = set()
         for dir_name in self.doc_dirs:
+            for root, dirs, files in os.walk(version_dir / dir_name):
+                relative_root = Path(root).relative_to(version_dir).as_posix()
+                # Symlinked directories are synced as links, like files
+                linked = [name for name in dirs if os.path.islink(os.path.join(root, name))]
+                existing.update(f"docs/{relative_root}/{name}" for name in files + linked)
+        return existing
+
+    def remove_doc_file(self, version_dir: Path, path: str):
+        """Remove a synced file and any directories it leaves empty."""
+        target = self.doc_target(version_dir, path)
+        if target.is_symlink() or target.exists():
+            target.unlink()
+        parent = target.parent
+        while parent != version_dir and parent.is_dir() and not any(parent.iterdir()):
+            parent.rmdir()
+            parent = parent.parent
+
+    @classmethod
+    def link_tree(cls, source: Path, target: Path):
+        """Recreate source at target with hardlinks, copying where the filesystem cannot link."""
+        if source.is_symlink():
+            os.symlink(os.readlink(source), target)
+        elif source.is_dir():
+            target.mkdir()
+            for entry in source.iterdir():
+                cls.link_tree(entry, target / entry.name)
+        else:
             try:
-                # Create archive of specific directory
-                archive_path = f"docs/{dir_name}"
-                result = subprocess.run([
-                    "git", "archive", tag, archive_path
-                ], cwd=self.repo_path, capture_output=True)
-                
-                if result.returncode == 0 and result.stdout:
-                    # Extract archive to temporary location
-                    with tempfile.TemporaryDirectory() as temp_dir:
-                        temp_path = Path(temp_dir)
-                        
-                        # Extract tar archive
-                        extract_result = subprocess.run([
-                            "tar", "-x", "-C", str(temp_path)
-                        ], input=result.stdout, capture_output=True)
-                        
-                        if extract_result.returncode == 0:
-                            source_dir = temp_path / "docs" / dir_name
-                            target_dir = version_dir / dir_name
-                            
-                            if source_dir.exists():
-                                shutil.copytree(source_dir, target_dir)
-                                print(f"✓ Extracted {dir_name} docs for version {version_key}")
-                            else:
-                                print(f"⚠ Warning: {dir_name} docs not found for version {version_key}")
-                                success = False
-                        else:
-                            print(f"⚠ Warning: Failed to extract {dir_name} for version {version_key}")
-                            success = False
-                else:
-                    print(f"⚠ Warning: {dir_name} docs not found for version {version_key}")
-                    success = False
-                    
-            except Exception as e:
-                print(f"✗ Error processing {dir_name} for version {version_key}: {e}")
-                success = False
+                os.link(source, target)
+            except OSError:
+                shutil.copy2(source, target)
+    
+    def stage_version_dir(self, version_key: str, full: bool) -> Path:
+        """Start a version's next tree in a staging directory.
+        
+        A delta starts from hardlinks to the whole live tree; a full rebuild
+        from everything but the doc dirs (e.g. its "changes since" pages).
+        Writes replace files rather than writing into them, so the live tree
+        is never modified through the shared links.
+        """
+        live_dir = self.docs_dir / version_key
+        self.staging_dir.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(dir=self.staging_dir, prefix=f"{version_key}-"))
+        # mkdtemp creates the directory private to its owner
+        os.chmod(staging, 0o755)
+        if live_dir.is_dir():
+            for entry in live_dir.iterdir():
+                if not (full and entry.name in self.doc_dirs):
+                    self.link_tree(entry, staging / entry.name)
+        return staging
+    
+    def swap_in_version_dir(self, version_key: str, staging: Path):
+        """Replace _docs/<version> with a completed staging tree.
+        
+        Where renameat2(RENAME_EXCHANGE) is available the two trees trade
+        places in one step, so _docs/<version> always exists. Elsewhere the
+        swap is two renames and is not atomic: between them the version is
+        briefly missing, and a crash there leaves the old tree under
+        .staging/, where recover_staging() puts it back. Either way the
+        version is the old or the new tree and never a mix of both.
+        """
+        live_dir = self.docs_dir / version_key
+        if live_dir.exists() and exchange_paths(staging, live_dir):
+            # staging now holds the old tree; an interrupted run drops it in recover_staging()
+            shutil.rmtree(staging)
+        elif live_dir.exists():
+            retired = self.staging_dir / f"{version_key}.old"
+            shutil.rmtree(retired, ignore_errors=True)
+            live_dir.rename(retired)
+            staging.rename(live_dir)
+            shutil.rmtree(retired)
+        else:
+            staging.rename(live_dir)
+    
+    def recover_staging(self) -> int:
+        """Clean up after an interrupted run: restore retired trees and drop partial ones."""
+        if not self.staging_dir.is_dir():
+            return 0
+        recovered = 0
+        for entry in self.staging_dir.iterdir():
+            live_dir = self.docs_dir / entry.name[:-len(".old")]
+            if entry.name.endswith(".old") and not live_dir.exists():
+                entry.rename(live_dir)
+                print(f"⚠ Restored {live_dir} from an interrupted swap")
+                recovered += 1
+            else:
+                shutil.rmtree(entry, ignore_errors=True)
+        return recovered
+    
+    def apply_plan(self, plan: "VersionPlan"):
+        """Build a version's next tree from the object store and swap it in for _docs/<version>."""
+        live_dir = self.docs_dir / plan.version_key
+        
+        # What is on disk now, so the change manifest can tell added from modified
+        if plan.full:
+            existing = self.existing_doc_files(live_dir)
+        else:
+            existing = {
+                path for path in [*plan.deletes, *plan.writes]
+                if self.doc_target(live_dir, path).is_symlink() or self.doc_target(live_dir, path).exists()
+            }
+        
+        version_dir = self.stage_version_dir(plan.version_key, plan.full)
+        try:
+            self.build_version_dir(plan, version_dir)
+            self.swap_in_version_dir(plan.version_key, version_dir)
+        except BaseException:
+            shutil.rmtree(version_dir, ignore_errors=True)
+            raise
+        
+        for path in plan.writes:
+            self.changes.record(self.doc_target(live_dir, path), "modified" if path in existing else "added")
+        for path in existing.difference(plan.writes):
+            self.changes.record(self.doc_target(live_dir, path), "deleted")
         
-        return success
+        self.metrics.count("files", len(plan.writes))
+        self.metrics.count("new_blobs", plan.new_blobs)
+        self.metrics.count("store_hits", len(plan.writes) - plan.new_blobs)
+    
+    def build_version_dir(self, plan: "VersionPlan", version_dir: Path):
+        """Write a plan's files into a staged version tree."""
+        if not plan.full:
+            for path in plan.deletes:
+                self.remove_doc_file(version_dir, path)
+        
+        # Markdown is written as transformed pages rather than links to the source blob
+        pages = {} if plan.full else dict(self.pages.get(plan.version_key, {}))
+        for path in plan.deletes:
+            pages.pop(path, None)
+        transformed = {}
+        if self.transformer:
+            transformed = {
+                path: oid for path, (mode, oid) in plan.writes.items() if self.transformer.handles(path, mode)
+            }
+            self.transformer.prepare(transformed.values())
+        
+        file_counts = {dir_name: 0 for dir_name in plan.present_dirs}
+        for path, (mode, oid) in plan.writes.items():
+            parts = PurePosixPath(path).parts
+            target = version_dir.joinpath(*parts[1:])
+            if not plan.full and (target.is_symlink() or target.exists()):
+                target.unlink()
+            if path in transformed:
+                size = self.transformer.write_page(oid, target)
+            else:
+                size = self.object_store.materialize(oid, mode, target)
+            self.metrics.count("bytes", size)
+            file_counts[parts[1]] = file_counts.get(parts[1], 0) + 1
+        
+        pages.update(transformed)
+        self.pages[plan.version_key] = pages
+        
+        if plan.full:
+            for dir_name, count in file_counts.items():
+                print(f"✓ Extracted {dir_name} docs for version {plan.version_key} ({count} files)")
+        else:
+            print(f"✓ Applied delta to {plan.version_key} ({plan.summary})")
+        print(f"✓ Stored {plan.new_blobs} new blobs for version {plan.version_key}")
 
-    def process_version(self, version_item) -> tuple:
-        """Process a single version (for parallel execution)."""
-        version_key, version = version_item
+    def apply_docs_delta(self, version: ReleaseVersion, version_key: str,
+                         old_commit: str, new_commit: str, trees: Dict[str, str]) -> Optional[bool]:
+        """Update a synced version from the diff between two commits.
+        
+        Returns None when the delta cannot be computed and a full extract is needed.
+        """
+        tag = self.tag_for(version_key, version)
+        
+        try:
+            changes = self.diff_docs_trees(old_commit, new_commit)
+        except subprocess.CalledProcessError:
+            # Old commit no longer available (e.g. shallow clone or rewritten history)
+            return None
+        
+        plan = self.plan_delta(version_key, tag, trees, changes, old_commit, new_commit)
+        
+        try:
+            missing = self.missing_blobs(plan)
+            if missing:
+                self.fetch_missing_blobs(tag, plan.present_dirs, missing)
+            plan.new_blobs = len(missing)
+            self.apply_plan(plan)
+        except (tarfile.TarError, OSError, RuntimeError) as e:
+            print(f"✗ Error applying docs delta for version {version_key}: {e}")
+            return None
+        
+        return plan.success
+
+    def cached_blob_listing(self, trees: Dict[str, str], dir_names: List[str]) -> Optional[Dict[str, tuple]]:
+        """The blob listing of the given doc dirs if every tree has been listed (or restored) before."""
+        if not all(trees[dir_name] in self.tree_listings for dir_name in dir_names):
+            return None
+        return {
+            f"docs/{dir_name}/{path}": entry
+            for dir_name in dir_names for path, entry in self.tree_listings[trees[dir_name]].items()
+        }
+    
+    def remember_listings(self, trees: Dict[str, str], dir_names: List[str], blobs: Dict[str, tuple]):
+        for dir_name in dir_names:
+            prefix = f"docs/{dir_name}/"
+            self.tree_listings[trees[dir_name]] = {
+                path[len(prefix):]: entry for path, entry in blobs.items() if path.startswith(prefix)
+            }
+    
+    def list_docs_blobs(self, tag: str, trees: Dict[str, str], dir_names: List[str]) -> Dict[str, tuple]:
+        """List every blob under the given doc dirs as path -> (mode, oid)."""
+        blobs = self.cached_blob_listing(trees, dir_names)
+        if blobs is not None:
+            return blobs
+        
+        if self.git_objects:
+            blobs = {}
+            with self.git_objects.reader() as reader:
+                for dir_name in dir_names:
+                    blobs.update(reader.list_tree(trees[dir_name], f"docs/{dir_name}"))
+        else:
+            output = self.run_git_command(
+                ["ls-tree", "-r", "-z", tag] + [f"docs/{dir_name}" for dir_name in dir_names]
+            )
+            blobs = {
+                path: (mode, oid)
+                for path, (mode, obj_type, oid) in self.parse_tree_entries(output).items()
+                if obj_type == "blob"
+            }
+        self.remember_listings(trees, dir_names, blobs)
+        return blobs
+    
+    def artifact_targets(self) -> Dict[str, Path]:
+        """Local directory mirrored by each top-level directory of the artifact cache."""
+        targets = {"objects": self.object_store.root}
+        if self.transformer:
+            targets["transformed"] = self.transformer.root
+        return targets
+    
+    def artifact_files(self, path: str, mode: str, oid: str) -> List[str]:
+        """Artifact cache files that write one synced file: its transformed page, or else its blob."""
+        if self.transformer and self.transformer.handles(path, mode):
+            cached = [self.transformer.body_path(oid)]
+            if self.transformer.prerender:
+                cached.append(self.transformer.html_path(oid))
+            return [f"transformed/{cached_path.relative_to(self.transformer.root).as_posix()}"
+                    for cached_path in cached]
+        return [f"objects/{oid[:2]}/{oid[2:]}"]
+    
+    def restore_artifacts(self) -> int:
+        """Restore the selected versions' docs trees from the artifact cache, returning how many."""
+        targets = self.artifact_targets()
+        restored = 0
+        for record in self.resolved.values():
+            for tree_oid in record["trees"].values():
+                if tree_oid in self.tree_listings:
+                    continue
+                entries = self.artifact_cache.restore(tree_oid, str(self.transform_revision), targets)
+                if entries is not None:
+                    self.tree_listings[tree_oid] = entries
+                    restored += 1
+        return restored
+    
+    def save_artifacts(self, synced: Dict[str, Dict]) -> int:
+        """Add the synced docs trees to the artifact cache, returning how many were new."""
+        targets = self.artifact_targets()
+        saved = self.artifact_cache.stats["saved"]
+        for record in synced.values():
+            for tree_oid in record["trees"].values():
+                entries = self.tree_listings.get(tree_oid)
+                if entries is None:
+                    # Versions updated from a delta were never listed in full; listing a tree reads no blobs
+                    output = self.run_git_command(["ls-tree", "-r", "-z", tree_oid])
+                    entries = {
+                        path: (mode, oid)
+                        for path, (mode, obj_type, oid) in self.parse_tree_entries(output).items()
+                        if obj_type == "blob"
+                    }
+                    self.tree_listings[tree_oid] = entries
+                files = {
+                    name for path, (mode, oid) in entries.items() for name in self.artifact_files(path, mode, oid)
+                }
+                self.artifact_cache.save(tree_oid, str(self.transform_revision), entries, files, targets)
+        return self.artifact_cache.stats["saved"] - saved
+
+    def fetch_missing_blobs(self, tag: str, dir_names: List[str], missing: Dict[str, tuple]) -> None:
+        """Copy blobs not yet in the object store out of git."""
+        if self.git_objects:
+            with self.git_objects.reader() as reader:
+                for mode, oid in missing.values():
+                    if not self.object_store.has(oid):
+                        self.object_store.write(
+                            oid, lambda dest: reader.copy_blob(oid, dest), executable=mode == "100755"
+                        )
+            return
+        
+        # Fallback: stream one git archive for the tag
+        self.metrics.count("subprocesses")
+        process = subprocess.Popen(
+            ["git", "archive", "--format=tar", tag] + [f"docs/{d}" for d in dir_names],
+            cwd=self.repo_path,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+        
+        try:
+            # Stream mode reads members incrementally, so memory stays bounded
+            with tarfile.open(fileobj=process.stdout, mode="r|") as archive:
+                for member in archive:
+                    if member.name not in missing:
+                        continue
+                    oid = missing[member.name][1]
+                    if self.object_store.has(oid):
+                        continue
+                    if member.isfile():
+                        with archive.extractfile(member) as source:
+                            self.object_store.add(oid, source, executable=bool(member.mode & 0o111))
+                    elif member.issym():
+                        self.object_store.add(oid, io.BytesIO(member.linkname.encode()))
+        finally:
+            _, stderr = process.communicate()
+        
+        if process.returncode != 0:
+            raise RuntimeError(f"git archive failed: {stderr.decode(errors='replace').strip()}")
+
+    def extract_docs_with_git_archive(self, version: ReleaseVersion, version_key: str,
+                                      trees: Dict[str, str]) -> bool:
+        """Extract documentation into hardlinks to the content-addressed object store."""
+        tag = self.tag_for(version_key, version)
+        
+        # git archive rejects pathspecs that match nothing, so only request present dirs
+        present_dirs = [dir_name for dir_name in self.doc_dirs if dir_name in trees]
         
         try:
-            print(f"Processing version {version_key} (tag: v{version})...")
+            blobs = self.list_docs_blobs(tag, trees, present_dirs) if present_dirs else {}
+            plan = self.plan_full(version_key, tag, trees, blobs)
             
-            if self.extract_docs_with_git_archive(version, version_key):
-                print(f"✓ Successfully processed version {version_key}")
-                return version_key, True, self.get_version_hash(version)
-            else:
-                print(f"⚠ Partial success for version {version_key}")
-                return version_key, False, None
+            # Only blobs never seen before have to be read out of git
+            missing = self.missing_blobs(plan)
+            if missing:
+                self.fetch_missing_blobs(tag, present_dirs, missing)
+            plan.new_blobs = len(missing)
+            self.apply_plan(plan)
+        except (tarfile.TarError, OSError, RuntimeError) as e:
+            print(f"✗ Error extracting docs for version {version_key}: {e}")
+            return False
+        
+        return plan.success and bool(present_dirs)
+
+    def process_version_in_slot(self, version_item, cache: Dict) -> tuple:
+        """process_version, holding one of the worker slots shared with other sources, if any."""
+        with self.worker_slots or nullcontext():
+            return self.process_version(version_item, cache)
+
+    def process_version(self, version_item, cache: Dict) -> tuple:
+        """Process a single version (for parallel execution)."""
+        version_key, version = version_item
+        tag = self.tag_for(version_key, version)
+        
+        with self.metrics.for_version(version_key):
+            try:
+                resolved = self.resolved[version_key]
+                trees, commit = resolved["trees"], resolved["commit"]
+                record = {"tag": tag, "commit": commit, "trees": trees, "transform": self.transform_revision}
+                cached = cache.get("versions", {}).get(version_key)
                 
-        except Exception as e:
-            print(f"✗ Error processing version {version_key}: {e}")
-            return version_key, False, None
+                # A forced run that was interrupted does not redo the versions it already completed
+                if ((not self.force or version_key in self.resumed)
+                        and self.is_version_unchanged(version_key, trees, cache)):
+                    print(f"✓ Version {version_key} (tag: {tag}) unchanged, skipping")
+                    self.metrics.count("cache_hits")
+                    return version_key, True, record
+                
+                print(f"Processing version {version_key} (tag: {tag})...")
+                
+                # Patch releases usually touch a handful of files, so apply just the delta
+                success = None
+                if not self.force and cached and cached.get("commit") and self.is_version_intact(version_key, cached):
+                    success = self.apply_docs_delta(version, version_key, cached["commit"], commit, trees)
+                if success is None:
+                    success = self.extract_docs_with_git_archive(version, version_key, trees)
+                
+                if success:
+                    print(f"✓ Successfully processed version {version_key}")
+                    self.journal.complete(version_key, {**record, "pages": self.pages.get(version_key, {})})
+                    return version_key, True, record
+                else:
+                    print(f"⚠ Partial success for version {version_key}")
+                    return version_key, False, None
+                    
+            except Exception as e:
+                print(f"✗ Error processing version {version_key}: {e}")
+                return version_key, False, None
 
-    def sync_versions_parallel(self, versions_to_process: Dict[str, semver.VersionInfo]) -> List[str]:
-        """Process versions in parallel for better performance."""
-        successful_versions = []
+    def sync_versions_parallel(self, versions_to_process: Dict[str, ReleaseVersion], cache: Dict,
+                               on_settled: Optional[Callable[[str, bool], None]] = None) -> Dict[str, Dict]:
+        """Process versions in parallel, returning the sync record of each synced version.
+        
+        on_settled is called with each version and whether it succeeded as soon as it finishes.
+        """
+        synced = {}
         
         # Process versions in parallel
         with ThreadPoolExecutor(max_workers=self.parallel_workers) as executor:
-            # Submit all tasks
+            # The pool starts tasks in submission order, so newest-first submission is newest-first scheduling
             future_to_version = {
-                executor.submit(self.process_version, item): item[0] 
-                for item in versions_to_process.items()
+                executor.submit(self.process_version_in_slot, item, cache): item[0] 
+                for item in sorted(versions_to_process.items(), key=lambda item: item[1], reverse=True)
             }
             
             # Collect results as they complete
             for future in as_completed(future_to_version):
                 version_key = future_to_version[future]
+                success = False
                 try:
-                    result_key, success, version_hash = future.result()
+                    result_key, success, record = future.result()
                     if success:
-                        successful_versions.append(result_key)
+                        synced[result_key] = record
                 except Exception as e:
                     print(f"✗ Exception processing {version_key}: {e}")
+                if on_settled:
+                    on_settled(version_key, success)
         
-        # Sort successful versions by semantic version (newest first)
-        successful_versions.sort(
-            key=lambda v: versions_to_process[v], 
-            reverse=True
+        return self.order_by_version(synced, versions_to_process)
+
+    def sync_versions_async(self, versions_to_process: Dict[str, ReleaseVersion], cache: Dict,
+                            on_settled: Optional[Callable[[str, bool], None]] = None) -> Dict[str, Dict]:
+        """Process versions through the asyncio pipeline engine."""
+        engine = AsyncSyncEngine(
+            self,
+            resolve_workers=self.parallel_workers,
+            stream_workers=max(self.parallel_workers // 2, 1),
+            write_workers=self.parallel_workers,
+            on_settled=on_settled
         )
-        
-        return successful_versions
+        synced = asyncio.run(engine.run(versions_to_process, cache))
+        return self.order_by_version(synced, versions_to_process)
+
+    @staticmethod
+    def order_by_version(synced: Dict[str, Dict],
+                         versions_to_process: Dict[str, ReleaseVersion]) -> Dict[str, Dict]:
+        """Order synced versions by semantic version (newest first)."""
+        return {
+            version_key: synced[version_key]
+            for version_key in sorted(synced, key=lambda v: versions_to_process[v], reverse=True)
+        }
 
-    def create_latest_symlink(self, latest_version: str):
-        """Create or update the 'latest' symlink."""
-        latest_link = self.docs_dir / "latest"
+    def mark_version_pages(self, version_key: str, record: Dict):
+        """Record every page of a version as modified after its navigation changed.
         
-        if latest_link.is_symlink() or latest_link.exists():
-            latest_link.unlink()
+        The pages themselves are left alone: they may be hardlinks shared with
+        other versions and sources, whose mtimes must not move with this one.
+        build-incremental.py removes the built output of recorded pages, which
+        makes Jekyll re-render them.
+        """
+        version_dir = self.docs_dir / version_key
+        for dir_name in record["trees"]:
+            for page in (version_dir / dir_name).rglob("*.md"):
+                if page.is_file() and not page.is_symlink():
+                    self.changes.record_touched(page)
+    
+    def publish_latest(self, latest_version: str):
+        """Point the 'latest' alias at a version through redirect stubs."""
+        previous = self.latest_alias.current()
+        self.changes.record_latest(previous, latest_version)
         
-        latest_link.symlink_to(latest_version)
-        print(f"✓ Created 'latest' symlink pointing to {latest_version}")
+        stubs = self.latest_alias.publish(latest_version)
+        for kind, paths in stubs.items():
+            for path in paths:
+                self.changes.record(path, kind)
+        
+        rewritten = sum(len(paths) for paths in stubs.values())
+        if previous == latest_version and not rewritten:
+            print(f"✓ 'latest' already redirects to {latest_version}")
+        else:
+            print(f"✓ 'latest' now redirects to {latest_version} ({len(stubs['added'])} stubs added, "
+                  f"{len(stubs['modified'])} updated, {len(stubs['deleted'])} removed)")
 
     def update_index_page(self, recent_versions: List[str]):
         """Update the index.md page with links to recent versions."""
         index_path = self.docs_dir / "index.md"
         
         if not index_path.exists():
-            print("⚠ Warning: _docs/index.md not found, skipping update")
+            print(f"⚠ Warning: {index_path} not found, skipping update")
             return
         
         with open(index_path, 'r') as f:
@@ -256,11 +2993,12 @@ class OptimizedDocSync:
         version_links = [
             "## 📚 Documentation Versions",
             "",
-            "- **[Latest (Stable)](/docs/latest/)** - Most recent stable release"
+            f"- **[Latest (Stable)](/docs/{self.collection_prefix}latest/)** - Most recent stable release"
         ]
         
         for version in recent_versions[:7]:
-            version_links.append(f"- **[Version {version}](/docs/{version}/)** - Documentation for v{version}")
+            version_links.append(f"- **[Version {version}](/docs/{self.collection_prefix}{version}/)** "
+                                 f"- Documentation for v{version}")
         
         version_links.append("")
         version_section = "\n".join(version_links)
@@ -293,60 +3031,261 @@ class OptimizedDocSync:
                 new_lines.insert(insert_index, version_section)
                 new_lines.insert(insert_index, "")
         
+        new_content = '\n'.join(new_lines)
+        if new_content == content:
+            # Leave the file (and its mtime) alone so the link check can skip it
+            print(f"✓ index.md already lists {len(recent_versions[:7])} recent versions")
+            return
+        
         with open(index_path, 'w') as f:
-            f.write('\n'.join(new_lines))
+            f.write(new_content)
+        self.changes.record(index_path, "modified")
         
         print(f"✓ Updated index.md with {len(recent_versions[:7])} recent versions")
 
-    def run(self):
-        """Main execution method."""
+    def watch(self, interval: float = 0.5):
+        """Sync once, then re-sync the minor lines of tags as they are added, moved or deleted."""
+        watcher = RefWatcher(self.repo_path, interval)
+        self.run()
+        
+        print(f"\nWatching {watcher.tags_dir} and {watcher.packed_refs.name} for tag changes "
+              f"(Ctrl+C to stop)...")
+        while True:
+            changed = watcher.wait()
+            lines = {
+                f"{version.major}.{version.minor}"
+                for version in map(parse_release_tag, changed) if version is not None
+            }
+            if not lines:
+                print(f"Ignoring changed non-release tags: {', '.join(sorted(changed))}")
+                continue
+            
+            print(f"\nTags changed: {', '.join(sorted(changed))}; re-syncing {', '.join(sorted(lines))}")
+            # Every counter reported at the end of a run describes that run alone
+            self.metrics.reset()
+            self.object_store.reset_stats()
+            if self.artifact_cache:
+                self.artifact_cache.reset_stats()
+            try:
+                self.run(only=lines)
+            except SystemExit:
+                print("⚠ Sync failed; waiting for the next tag change")
+
+    def run(self, only: Optional[Set[str]] = None):
+        """Main execution method.
+        
+        With only, just those minor lines are re-synced; the other selected
+        versions keep their cached records as long as their output is intact.
+        """
         print(f"Starting optimized versioned documentation sync...")
-        print(f"Max versions: {self.max_versions}, Parallel workers: {self.parallel_workers}")
+        print(f"Max versions: {self.max_versions}, Parallel workers: {self.parallel_workers}, "
+              f"Engine: {self.engine}")
         
         # Create docs directory
         self.docs_dir.mkdir(exist_ok=True)
+        self.resolved = {}
+        self.tags_scanned = 0
+        self.synced_versions = []
+        self.changes.reset()
         
         # Load cache
-        cache = self.load_cache()
+        with self.metrics.phase("cache_load"):
+            cache = self.load_cache()
+        
+        # Resume an interrupted run: its completed versions count as synced, its torn work is dropped
+        self.recover_staging()
+        journal = self.journal.load()
+        resumed = journal.get("versions", {})
+        if resumed:
+            cache.setdefault("versions", {}).update(resumed)
+            self.changes.restore(journal)
+            print(f"Resuming an interrupted sync: {len(resumed)} versions already completed "
+                  f"({', '.join(resumed)})")
+        self.resumed = set(resumed)
+        self.journal.start(resumed)
+        self.pages = {
+            version_key: dict(record.get("pages", {}))
+            for version_key, record in cache.get("versions", {}).items()
+        }
+        
+        # Bring the blobless mirror up to date before reading its tags
+        if self.mirror:
+            with self.metrics.phase("mirror_update"):
+                self.mirror.ensure()
         
-        # Get and parse tags efficiently
+        # Stream tags newest first and stop once enough minor lines are found
         print("Fetching git tags...")
-        tags = self.get_git_tags_efficiently()
-        if not tags:
+        with self.metrics.phase("tag_listing"):
+            versions_to_process = self.enumerate_release_tags()
+        if not self.tags_scanned:
             print("No git tags found in repository")
             sys.exit(1)
         
-        print(f"Found {len(tags)} tags")
+        print(f"Scanned {self.tags_scanned} tags")
         
-        # Parse and filter versions
-        versions_to_process = self.parse_and_filter_versions(tags)
         if not versions_to_process:
             print("No valid semantic version tags found")
             sys.exit(1)
         
-        print(f"Processing {len(versions_to_process)} minor versions (limited to {self.max_versions})...")
+        # Versions outside `only` whose newest tag did not move are carried over as-is
+        carried = {}
+        if only is not None:
+            for version_key in versions_to_process:
+                cached = cache.get("versions", {}).get(version_key)
+                if (version_key not in only and self.is_version_intact(version_key, cached)
+                        and cached.get("tag") == self.resolved[version_key]["tag"]):
+                    carried[version_key] = cached
+                    del self.resolved[version_key]
+        versions_to_sync = {
+            version_key: version for version_key, version in versions_to_process.items()
+            if version_key not in carried
+        }
         
-        # Process versions in parallel
-        successful_versions = self.sync_versions_parallel(versions_to_process)
+        # Peeled commits and docs trees for every selected tag in one git call
+        if self.resolved:
+            with self.metrics.phase("tree_resolution"):
+                self.resolve_docs_trees()
+        
+        # Trees seen by an earlier deploy come from the artifact cache instead of git
+        if self.artifact_cache and self.resolved:
+            with self.metrics.phase("artifact_restore"):
+                restored = self.restore_artifacts()
+            print(f"✓ Artifact cache: restored {restored} docs trees")
+        
+        # Fetch the docs blobs of the selected versions in one batch
+        if self.mirror:
+            with self.metrics.phase("mirror_hydrate"):
+                fetched = self.mirror.hydrate(
+                    oid for record in self.resolved.values() for oid in record["trees"].values()
+                    if oid not in self.tree_listings
+                )
+            print(f"Hydrated {fetched} docs blobs from {self.mirror.source_url}")
+        
+        print(f"Processing {len(versions_to_sync)} minor versions (limited to {self.max_versions})...")
+        if carried:
+            print(f"Keeping {len(carried)} unaffected versions: {', '.join(carried)}")
+        
+        # Newest versions go first, and latest and the index move as soon as they land
+        publisher = ProgressivePublisher(
+            self,
+            order=sorted(versions_to_process, key=versions_to_process.get, reverse=True),
+            published=cache.get("processed_versions", [])
+        )
+        for version_key in carried:
+            publisher.settle(version_key, True)
+        
+        def settle(version_key: str, success: bool):
+            publisher.settle(version_key, success)
+            # Journal each landed version with the changes recorded so far, including 'latest'
+            self.journal.write(self.changes)
+        
+        # Process versions in parallel, skipping those whose docs trees are unchanged
+        synced = {}
+        with self.metrics.phase("extraction"):
+            try:
+                if self.engine == "async":
+                    synced = self.sync_versions_async(versions_to_sync, cache, settle)
+                elif versions_to_sync:
+                    self.start_git_objects(next(iter(self.resolved.values()))["tag"])
+                    synced = self.sync_versions_parallel(versions_to_sync, cache, settle)
+            finally:
+                if self.transformer:
+                    self.transformer.close()
+                if self.git_objects:
+                    self.git_objects.close()
+        synced = self.order_by_version({**carried, **synced}, versions_to_process)
+        for version_key, record in synced.items():
+            record["pages"] = self.pages.get(version_key, {})
+        successful_versions = list(synced)
+        self.synced_versions = successful_versions
         
         if successful_versions:
-            # Create latest symlink
+            # "Changes since X.Y" pages; each tag pair is diffed only once
+            with self.metrics.phase("version_diffs"):
+                diff_pages = self.version_changes.update(synced)
+            for kind, pages in diff_pages.items():
+                for page in pages:
+                    self.changes.record(page, kind)
+            print(f"✓ Version diffs: {len(diff_pages['added']) + len(diff_pages['modified'])} pages written, "
+                  f"{self.version_changes.diffs_computed} tag pairs diffed")
+            
+            # Normally already published as versions landed; this settles any that were not
+            # and, now that its "changes since" page exists, stubs that page too
             latest_version = successful_versions[0]
-            self.create_latest_symlink(latest_version)
+            with self.metrics.phase("latest_alias"):
+                self.publish_latest(latest_version)
             
             # Update index page
-            self.update_index_page(successful_versions)
+            with self.metrics.phase("index_update"):
+                self.update_index_page(successful_versions)
+            
+            # Navigation data is rebuilt only for versions whose docs trees changed
+            with self.metrics.phase("navigation"):
+                renavigated = self.navigation.update(synced, force=self.force)
+                for version_key in renavigated:
+                    self.mark_version_pages(version_key, synced[version_key])
+            print(f"✓ Navigation: {len(renavigated)} versions changed structure")
+            
+            # Only versions whose docs trees changed are re-indexed
+            with self.metrics.phase("search_index"):
+                reindexed = self.search_index.update(synced, force=self.force)
+            print(f"✓ Search index: {reindexed} versions re-indexed, "
+                  f"{len(synced) - reindexed} up to date")
+            
+            # One path index over all versions; only changed pages are re-read
+            with self.metrics.phase("link_check"):
+                self.broken_links = self.link_checker.check()
+            for page, target in self.broken_links[:20]:
+                print(f"⚠ Broken link in _docs/{page}: {target}")
+            if len(self.broken_links) > 20:
+                print(f"⚠ ... and {len(self.broken_links) - 20} more broken links")
+            print(f"✓ Link check: {len(self.broken_links)} broken internal links "
+                  f"({self.link_checker.files_parsed} pages re-read)")
+            
+            # Tell the site build which pages changed since it last ran
+            with self.metrics.phase("manifest"):
+                manifest = self.changes.write(successful_versions)
+            print(f"✓ Change manifest: {len(manifest['added'])} added, {len(manifest['modified'])} modified, "
+                  f"{len(manifest['deleted'])} deleted pending the next build")
             
             # Save cache
             new_cache = {
                 "last_sync": str(Path.cwd()),
                 "processed_versions": successful_versions,
-                "timestamp": str(subprocess.run(["date"], capture_output=True, text=True).stdout.strip())
+                "timestamp": datetime.now().astimezone().isoformat(),
+                "versions": synced
             }
-            self.save_cache(new_cache)
+            with self.metrics.phase("cache_save"):
+                # Until the cache holds this run's versions, the journal is what resumes them
+                if self.save_cache(new_cache):
+                    self.journal.clear()
+            
+            # Before the prune, while every synced blob and page body is still on disk
+            if self.artifact_cache:
+                with self.metrics.phase("artifact_save"):
+                    saved = self.save_artifacts(synced)
+                    kept = self.artifact_cache.evict() if self.owns_object_store else None
+                print(f"✓ Artifact cache: {saved} new docs trees saved"
+                      + (f", {self.artifact_cache.stats['evicted']} evicted, {kept} bytes kept"
+                         if kept is not None else ""))
+            
+            # Drop objects that no version tree links to anymore
+            with self.metrics.phase("object_prune"):
+                pruned = self.object_store.prune() if self.owns_object_store else 0
+                if self.transformer:
+                    self.transformer.prune(
+                        {oid for record in synced.values() for oid in record["pages"].values()}
+                    )
+            stats = self.object_store.stats
             
             print(f"\n✓ Optimized documentation sync completed!")
             print(f"✓ Processed {len(successful_versions)} versions in parallel")
+            print(f"✓ Object store: {stats['files_linked']} files linked, {stats['files_copied']} copied, "
+                  f"{stats['bytes_written']} bytes written, "
+                  f"{self.object_store.bytes_deduplicated()} bytes deduplicated, {pruned} objects pruned")
+            print("✓ Timings: " + ", ".join(
+                f"{name} {seconds:.3f}s" for name, seconds in self.metrics.phases.items()
+            ))
             print(f"✓ Latest version: {latest_version}")
             print(f"✓ Available versions: {', '.join(successful_versions[:7])}")
         else:
@@ -354,23 +3293,519 @@ class OptimizedDocSync:
             sys.exit(1)
 
 
+class AsyncSyncEngine:
+    """asyncio sync pipeline, selected with --engine=async.
+    
+    Tag resolution, blob streaming and file materialization run as separate
+    stages with their own concurrency limits, connected by bounded queues, so
+    git output for one version overlaps with disk writes for another. Plans,
+    the object store and materialization are shared with the thread engine,
+    so both engines produce identical output.
+    """
+    
+    def __init__(self, sync: "OptimizedDocSync", resolve_workers: int = 4, stream_workers: int = 2,
+                 write_workers: int = 4, queue_size: int = 64,
+                 on_settled: Optional[Callable[[str, bool], None]] = None):
+        self.sync = sync
+        self.resolve_workers = max(resolve_workers, 1)
+        self.stream_workers = max(stream_workers, 1)
+        self.write_workers = max(write_workers, 1)
+        self.queue_size = queue_size
+        self.on_settled = on_settled
+        # Stage queues are priority queues on this rank, so the newest version is always served first
+        self.rank = {}
+        self.versions = {}
+        self.results = {}
+    
+    def settle(self, version_key: str, success: bool):
+        if self.on_settled:
+            self.on_settled(version_key, success)
+    
+    async def git(self, args: List[str]) -> str:
+        """Run a git command without blocking the event loop."""
+        self.sync.metrics.count("subprocesses")
+        process = await asyncio.create_subprocess_exec(
+            "git", *args,
+            cwd=self.sync.repo_path,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+        stdout, stderr = await process.communicate()
+        if process.returncode != 0:
+            raise subprocess.CalledProcessError(process.returncode, ["git"] + args, stdout, stderr)
+        return stdout.decode(errors="surrogateescape")
+    
+    async def start_cat_file(self) -> asyncio.subprocess.Process:
+        self.sync.metrics.count("subprocesses")
+        return await asyncio.create_subprocess_exec(
+            "git", "cat-file", "--batch",
+            cwd=self.sync.repo_path,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+    
+    async def resolve(self, version_key: str, version: ReleaseVersion,
+                      cache: Dict) -> Optional[VersionPlan]:
+        """Resolve a tag to its docs trees and plan the work, or None if unchanged."""
+        sync = self.sync
+        tag = self.sync.tag_for(version_key, version)
+        
+        resolved = sync.resolved[version_key]
+        trees, commit = resolved["trees"], resolved["commit"]
+        record = {"tag": tag, "commit": commit, "trees": trees, "transform": sync.transform_revision}
+        cached = cache.get("versions", {}).get(version_key)
+        
+        if (not sync.force or version_key in sync.resumed) and sync.is_version_unchanged(version_key, trees, cache):
+            print(f"✓ Version {version_key} (tag: {tag}) unchanged, skipping")
+            sync.metrics.count("cache_hits")
+            self.results[version_key] = record
+            self.settle(version_key, True)
+            return None
+        
+        print(f"Processing version {version_key} (tag: {tag})...")
+        
+        plan = None
+        if not sync.force and cached and cached.get("commit") and sync.is_version_intact(version_key, cached):
+            try:
+                changes = sync.parse_diff_tree(await self.git(sync.diff_tree_args(cached["commit"], commit)))
+                plan = sync.plan_delta(version_key, tag, trees, changes, cached["commit"], commit)
+            except subprocess.CalledProcessError:
+                plan = None
+        
+        if plan is None:
+            present_dirs = [dir_name for dir_name in sync.doc_dirs if dir_name in trees]
+            blobs = sync.cached_blob_listing(trees, present_dirs)
+            if blobs is None:
+                output = await self.git(
+                    ["ls-tree", "-r", "-z", tag] + [f"docs/{dir_name}" for dir_name in present_dirs]
+                )
+                blobs = {
+                    path: (mode, oid)
+                    for path, (mode, obj_type, oid) in sync.parse_tree_entries(output).items()
+                    if obj_type == "blob"
+                }
+                sync.remember_listings(trees, present_dirs, blobs)
+            plan = sync.plan_full(version_key, tag, trees, blobs)
+            plan.success = plan.success and bool(present_dirs)
+        
+        plan.record = record
+        return plan
+    
+    async def resolve_stage(self, resolve_queue: asyncio.Queue, stream_queue: asyncio.Queue, cache: Dict):
+        while True:
+            rank, version_key, version = await resolve_queue.get()
+            try:
+                with self.sync.metrics.for_version(version_key):
+                    plan = await self.resolve(version_key, version, cache)
+                if plan is not None:
+                    await stream_queue.put((rank, plan))
+            except Exception as e:
+                print(f"✗ Error processing version {version_key}: {e}")
+                self.settle(version_key, False)
+            finally:
+                resolve_queue.task_done()
+    
+    async def stream_stage(self, stream_queue: asyncio.Queue, blob_queue: asyncio.Queue,
+                           apply_queue: asyncio.Queue):
+        """Read missing blobs from a persistent cat-file process into the write queue."""
+        store = self.sync.object_store
+        process = await self.start_cat_file()
+        try:
+            while True:
+                _, plan = await stream_queue.get()
+                token = self.sync.metrics.current_version.set(plan.version_key)
+                try:
+                    requested = set()
+                    for mode, oid in self.sync.missing_blobs(plan).values():
+                        if oid in requested or store.has(oid):
+                            continue
+                        requested.add(oid)
+                        process.stdin.write(oid.encode() + b"\n")
+                        await process.stdin.drain()
+                        header = (await process.stdout.readline()).decode().split()
+                        if not header or header[-1] == "missing":
+                            raise RuntimeError(f"blob {oid} not found")
+                        data = await process.stdout.readexactly(int(header[2]))
+                        await process.stdout.readexactly(1)  # trailing newline
+                        plan.remaining += 1
+                        await blob_queue.put((plan, oid, data, mode == "100755"))
+                    plan.new_blobs = len(requested)
+                except Exception as e:
+                    plan.error = e
+                    # The pipe may be mid-object, so start a fresh reader
+                    process.kill()
+                    await process.wait()
+                    process = await self.start_cat_file()
+                finally:
+                    self.sync.metrics.current_version.reset(token)
+                    plan.streamed = True
+                    if plan.remaining == 0:
+                        await apply_queue.put((self.rank[plan.version_key], plan))
+                    stream_queue.task_done()
+        finally:
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+    
+    async def write_stage(self, blob_queue: asyncio.Queue, apply_queue: asyncio.Queue):
+        """Write streamed blobs into the object store off the event loop."""
+        while True:
+            plan, oid, data, executable = await blob_queue.get()
+            try:
+                await asyncio.to_thread(self.sync.object_store.add, oid, io.BytesIO(data), executable)
+            except Exception as e:
+                plan.error = plan.error or e
+            finally:
+                plan.remaining -= 1
+                if plan.streamed and plan.remaining == 0:
+                    await apply_queue.put((self.rank[plan.version_key], plan))
+                blob_queue.task_done()
+    
+    async def apply(self, plan: VersionPlan):
+        """Apply a streamed plan, re-extracting the whole version if a delta fails."""
+        try:
+            if plan.error:
+                raise plan.error
+            await asyncio.to_thread(self.sync.apply_plan, plan)
+        except (tarfile.TarError, OSError, RuntimeError) as e:
+            if plan.full:
+                raise
+            # Same recovery as the thread engine's apply_docs_delta
+            print(f"✗ Error applying docs delta for version {plan.version_key}: {e}")
+            plan.success = await asyncio.to_thread(
+                self.sync.extract_docs_with_git_archive,
+                self.versions[plan.version_key], plan.version_key, plan.record["trees"]
+            )
+    
+    async def apply_stage(self, apply_queue: asyncio.Queue):
+        """Materialize a version once all of its blobs are in the object store."""
+        while True:
+            _, plan = await apply_queue.get()
+            success = False
+            try:
+                with self.sync.metrics.for_version(plan.version_key):
+                    await self.apply(plan)
+                if plan.success:
+                    print(f"✓ Successfully processed version {plan.version_key}")
+                    self.results[plan.version_key] = plan.record
+                    self.sync.journal.complete(
+                        plan.version_key, {**plan.record, "pages": self.sync.pages.get(plan.version_key, {})}
+                    )
+                    success = True
+                else:
+                    print(f"⚠ Partial success for version {plan.version_key}")
+            except Exception as e:
+                print(f"✗ Error processing version {plan.version_key}: {e}")
+            finally:
+                self.settle(plan.version_key, success)
+                apply_queue.task_done()
+    
+    async def run(self, versions_to_process: Dict[str, ReleaseVersion], cache: Dict) -> Dict[str, Dict]:
+        """Run the pipeline, returning the sync record of each synced version."""
+        resolve_queue = asyncio.PriorityQueue()
+        stream_queue = asyncio.PriorityQueue(self.queue_size)
+        blob_queue = asyncio.Queue(self.queue_size)
+        apply_queue = asyncio.PriorityQueue(self.queue_size)
+        
+        newest_first = sorted(versions_to_process.items(), key=lambda item: item[1], reverse=True)
+        for rank, (version_key, version) in enumerate(newest_first):
+            self.rank[version_key] = rank
+            self.versions[version_key] = version
+            resolve_queue.put_nowait((rank, version_key, version))
+        
+        tasks = (
+            [asyncio.create_task(self.resolve_stage(resolve_queue, stream_queue, cache))
+             for _ in range(self.resolve_workers)]
+            + [asyncio.create_task(self.stream_stage(stream_queue, blob_queue, apply_queue))
+               for _ in range(self.stream_workers)]
+            + [asyncio.create_task(self.write_stage(blob_queue, apply_queue))
+               for _ in range(self.write_workers)]
+            + [asyncio.create_task(self.apply_stage(apply_queue))
+               for _ in range(self.write_workers)]
+        )
+        
+        # Each stage hands its work on before marking it done, so draining in order is complete
+        try:
+            for stage_queue in (resolve_queue, stream_queue, blob_queue, apply_queue):
+                await stage_queue.join()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        
+        return self.results
+
+
+def load_sources_config(path: Path) -> Dict:
+    """Read a multi-source config: TOML for *.toml, JSON otherwise.
+    
+    Top-level "workers" sets the shared worker budget; each entry of
+    "sources" has a name and repo, and optionally url (keep a blobless
+    mirror of it at repo), target (default _docs/<name>), doc_dirs,
+    max_versions and tag_prefix (e.g. "stdlib-" for stdlib-v1.2.0 tags).
+    """
+    with open(path, "rb") as f:
+        if path.suffix == ".toml":
+            try:
+                import tomllib
+            except ImportError:
+                raise ValueError("TOML configs need Python 3.11+; use a JSON config instead")
+            config = tomllib.load(f)
+        else:
+            config = json.load(f)
+    
+    sources = config.get("sources")
+    if not sources:
+        raise ValueError("no sources configured")
+    names, targets = set(), set()
+    for source in sources:
+        if "name" not in source or "repo" not in source:
+            raise ValueError("every source needs a name and a repo")
+        if source["name"] in names:
+            raise ValueError(f"duplicate source name {source['name']}")
+        names.add(source["name"])
+        target = Path(source.setdefault("target", f"_docs/{source['name']}"))
+        if target != Path("_docs") and (target.parts[0] != "_docs" or len(target.parts) < 2):
+            raise ValueError(f"target {target} of {source['name']} must be _docs or a directory below it")
+        # Version directories (X.Y, latest) of a source synced to _docs/ itself would collide
+        if target.parts[1:] and (re.fullmatch(r"\d+\.\d+", target.parts[1]) or target.parts[1] == "latest"):
+            raise ValueError(f"target {target} of {source['name']} clashes with a version directory")
+        if target in targets:
+            raise ValueError(f"sources share the target {target}")
+        targets.add(target)
+    # Only _docs/ itself may hold other targets, next to its version directories
+    for target in targets - {Path("_docs")}:
+        if any(target in other.parents for other in targets):
+            raise ValueError(f"target {target} contains another source's target")
+    return config
+
+
+class MultiSourceSync:
+    """Syncs the docs of several repositories side by side, from one config.
+    
+    Every source gets its own OptimizedDocSync writing below its target
+    directory. Sources run concurrently, their version tasks draw from one
+    pool of worker slots, and they share one content-addressed object store,
+    so a file identical across repositories is stored once and hardlinked
+    into each of them.
+    """
+    
+    def __init__(self, config: Dict, parallel_workers: int = 4, max_versions: int = 10, force: bool = False,
+                 git_backend: str = "cat-file", engine: str = "thread", transform: bool = True,
+                 prerender: bool = False, artifact_cache: Optional[ArtifactCache] = None):
+        self.workers = max(config.get("workers", parallel_workers), 1)
+        self.worker_slots = threading.Semaphore(self.workers)
+        self.object_store = ObjectStore(Path("_docs") / ".objects")
+        self.artifact_cache = artifact_cache
+        self.failed = []
+        
+        sources = config["sources"]
+        # Every source merges its changes into the one manifest build-incremental.py reads
+        targets = [Path(source["target"]) for source in sources]
+        manifest_path = Path("_docs") / ".sync_manifest.json"
+        # The slots cap thread-engine version tasks; the async pipeline gets a share of the budget instead
+        source_workers = self.workers if engine == "thread" else max(self.workers // len(sources), 1)
+        self.syncs = {
+            source["name"]: OptimizedDocSync(
+                repo_path=Path(source["repo"]),
+                max_versions=source.get("max_versions", max_versions),
+                parallel_workers=source_workers,
+                force=force,
+                git_backend=git_backend,
+                engine=engine,
+                source_url=source.get("url"),
+                transform=transform,
+                docs_dir=Path(source["target"]),
+                doc_dirs=source.get("doc_dirs"),
+                tag_prefix=source.get("tag_prefix", ""),
+                object_store=self.object_store,
+                worker_slots=self.worker_slots,
+                prerender=prerender,
+                artifact_cache=artifact_cache,
+                changes=ChangeManifest(manifest_path, Path(source["target"]), targets)
+            )
+            for source in sources
+        }
+    
+    @property
+    def broken_links(self) -> List[tuple]:
+        return [link for sync in self.syncs.values() for link in sync.broken_links]
+    
+    def run_source(self, name: str):
+        try:
+            self.syncs[name].run()
+        except SystemExit as e:
+            # run() exits when a source has no usable tags; the other sources carry on
+            if e.code:
+                self.failed.append(name)
+        except Exception as e:
+            print(f"✗ Source {name} failed: {e}")
+            self.failed.append(name)
+    
+    def run(self):
+        print(f"Syncing {len(self.syncs)} sources with {self.workers} shared workers...")
+        with ThreadPoolExecutor(max_workers=len(self.syncs)) as executor:
+            list(executor.map(self.run_source, self.syncs))
+        
+        # Only now is every source's output linked, so unreferenced objects are really unused
+        pruned = self.object_store.prune()
+        stats = self.object_store.stats
+        kept = self.artifact_cache.evict() if self.artifact_cache else None
+        
+        print("\n✓ Multi-source sync completed!")
+        for name, sync in self.syncs.items():
+            status = "failed" if name in self.failed else ", ".join(sync.synced_versions)
+            print(f"✓ {name} -> {sync.docs_dir}: {status}")
+        print(f"✓ Shared object store: {stats['files_linked']} files linked, {stats['files_copied']} copied, "
+              f"{stats['bytes_written']} bytes written, "
+              f"{self.object_store.bytes_deduplicated()} bytes deduplicated, {pruned} objects pruned")
+        if kept is not None:
+            print(f"✓ Artifact cache: {self.artifact_cache.stats['restored']} trees restored, "
+                  f"{self.artifact_cache.stats['saved']} saved, {self.artifact_cache.stats['evicted']} evicted, "
+                  f"{kept} bytes kept")
+        if self.failed:
+            print(f"✗ Sources failed: {', '.join(self.failed)}")
+            sys.exit(1)
+
+
+def open_artifact_cache(args) -> Optional[ArtifactCache]:
+    """The --cache-dir artifact cache, if one was given."""
+    if not args.cache_dir:
+        return None
+    cache_dir = Path(args.cache_dir)
+    if cache_dir.resolve().is_relative_to(Path("_docs").resolve()):
+        # Everything under _docs/ is site content or per-checkout sync state
+        print(f"Error: cache directory {cache_dir} must be outside _docs/")
+        sys.exit(1)
+    return ArtifactCache(cache_dir, args.cache_size * 1024 * 1024)
+
+
+def run_multi_source(args):
+    """--config mode: sync every configured source."""
+    if args.repo_path or args.source or args.watch or args.metrics_out:
+        print("Error: --config cannot be combined with repo_path, --source, --watch or --metrics-out")
+        sys.exit(1)
+    try:
+        config = load_sources_config(Path(args.config))
+    except (OSError, ValueError) as e:
+        print(f"Error: invalid config {args.config}: {e}")
+        sys.exit(1)
+    
+    for source in config["sources"]:
+        repo_path = Path(source["repo"])
+        if not source.get("url") and not (repo_path / ".git").exists():
+            print(f"Error: {source['name']}: {repo_path} is not a git repository")
+            sys.exit(1)
+    
+    multi = MultiSourceSync(
+        config,
+        parallel_workers=args.parallel,
+        max_versions=args.max_versions,
+        force=args.force,
+        git_backend=args.git_backend,
+        engine=args.engine,
+        transform=not args.no_transform,
+        prerender=args.prerender,
+        artifact_cache=open_artifact_cache(args)
+    )
+    profiler = cProfile.Profile() if args.profile else None
+    try:
+        if profiler:
+            profiler.runcall(multi.run)
+        else:
+            multi.run()
+        if args.fail_on_broken_links and multi.broken_links:
+            print(f"✗ {len(multi.broken_links)} broken internal links")
+            sys.exit(1)
+    finally:
+        if profiler:
+            profiler.dump_stats(args.profile)
+            pstats.Stats(profiler).sort_stats("cumulative").print_stats(20)
+            print(f"✓ Profile written to {args.profile}")
+
+
 def main():
     parser = argparse.ArgumentParser(description="Optimized versioned documentation sync")
-    parser.add_argument("repo_path", help="Path to source repository")
+    parser.add_argument("repo_path", nargs="?",
+                       help="Path to source repository (the mirror directory with --source)")
     parser.add_argument("--max-versions", type=int, default=10, 
                        help="Maximum number of versions to process (default: 10)")
     parser.add_argument("--parallel", type=int, default=4,
                        help="Number of parallel workers (default: 4)")
+    parser.add_argument("--force", action="store_true",
+                       help="Re-extract every version, ignoring the sync cache")
+    parser.add_argument("--engine", choices=["thread", "async"], default="thread",
+                       help="Sync engine: thread pool or asyncio pipeline (default: thread)")
+    parser.add_argument("--git-backend", choices=["cat-file", "subprocess"], default="cat-file",
+                       help="Object access: persistent git cat-file processes or "
+                            "one git subprocess per operation (default: cat-file); "
+                            "the async engine always streams blobs through cat-file")
+    parser.add_argument("--no-transform", action="store_true",
+                       help="Copy Markdown as-is instead of adding front matter, "
+                            "rewriting .md links and normalizing headings")
+    parser.add_argument("--prerender", action="store_true",
+                       help="Render Markdown to HTML in the process pool (needs the 'markdown' and "
+                            "'pygments' packages), so the site build only wraps ready-made HTML")
+    parser.add_argument("--fail-on-broken-links", action="store_true",
+                       help="Exit with an error if the link check finds broken internal links")
+    parser.add_argument("--watch", action="store_true",
+                       help="After syncing, poll the repository's tags and re-sync the minor "
+                            "lines of tags that are added, moved or deleted")
+    parser.add_argument("--watch-interval", type=float, default=0.5,
+                       help="Seconds between tag ref polls in --watch mode (default: 0.5)")
+    parser.add_argument("--source",
+                       help="Remote URL to keep a blobless tag mirror of at repo_path, "
+                            "cloned on first use and fetched incrementally afterwards")
+    parser.add_argument("--cache-dir",
+                       help="Portable cache of synced docs trees keyed by tree OID (e.g. for CI caches); "
+                            "versions are restored from it before reading git")
+    parser.add_argument("--cache-size", type=int, default=512,
+                       help="Evict least recently used trees from --cache-dir beyond this many MB (default: 512)")
+    parser.add_argument("--config",
+                       help="Sync several repositories side by side from a TOML or JSON config "
+                            "(sources, doc dirs, tag prefixes and targets) instead of repo_path")
+    
+    parser.add_argument("--metrics-out",
+                       help="Write phase timings and per-version counters to this file")
+    parser.add_argument("--metrics-format", choices=["json", "prometheus"],
+                       help="Metrics file format (default: prometheus for *.prom, else json)")
+    parser.add_argument("--profile", nargs="?", const="sync-docs.pstats",
+                       help="Run under cProfile and dump stats to this file (default: sync-docs.pstats)")
     
     args = parser.parse_args()
     
+    if args.engine == "async" and args.git_backend == "subprocess":
+        parser.error("--engine=async streams blobs through git cat-file and cannot be combined "
+                     "with --git-backend=subprocess")
+    if args.prerender:
+        if args.no_transform:
+            parser.error("--prerender renders transformed pages and cannot be combined with --no-transform")
+        # Without Pygments code blocks would silently lose their highlighting
+        if importlib.util.find_spec("markdown") is None or importlib.util.find_spec("pygments") is None:
+            print("Error: --prerender needs the 'markdown' and 'pygments' packages (pip install markdown pygments)")
+            sys.exit(1)
+    
+    if args.config:
+        run_multi_source(args)
+        return
+    if not args.repo_path:
+        parser.error("repo_path is required unless --config is given")
     repo_path = Path(args.repo_path)
     
-    if not repo_path.exists() or not repo_path.is_dir():
+    if args.watch and args.source:
+        print("Error: --watch needs a local repository and cannot be combined with --source")
+        sys.exit(1)
+    
+    if args.source:
+        if repo_path.exists() and not (repo_path / "HEAD").exists():
+            print(f"Error: {repo_path} exists and is not a git mirror")
+            sys.exit(1)
+    elif not repo_path.exists() or not repo_path.is_dir():
         print(f"Error: Source repository not found at {repo_path}")
         sys.exit(1)
     
-    if not (repo_path / ".git").exists():
+    elif not (repo_path / ".git").exists():
         print(f"Error: {repo_path} is not a git repository")
         sys.exit(1)
     
@@ -378,10 +3813,40 @@ def main():
     optimizer = OptimizedDocSync(
         repo_path=repo_path,
         max_versions=args.max_versions,
-        parallel_workers=args.parallel
+        parallel_workers=args.parallel,
+        force=args.force,
+        git_backend=args.git_backend,
+        engine=args.engine,
+        source_url=args.source,
+        transform=not args.no_transform,
+        prerender=args.prerender,
+        artifact_cache=open_artifact_cache(args)
     )
     
-    optimizer.run()
+    sync = (lambda: optimizer.watch(args.watch_interval)) if args.watch else optimizer.run
+    profiler = cProfile.Profile() if args.profile else None
+    try:
+        if profiler:
+            profiler.runcall(sync)
+        else:
+            sync()
+        if args.fail_on_broken_links and optimizer.broken_links:
+            print(f"✗ {len(optimizer.broken_links)} broken internal links")
+            sys.exit(1)
+    except KeyboardInterrupt:
+        if not args.watch:
+            raise
+        print("\nStopped watching")
+    finally:
+        if args.metrics_out:
+            metrics_path = Path(args.metrics_out)
+            metrics_format = args.metrics_format or ("prometheus" if metrics_path.suffix == ".prom" else "json")
+            optimizer.metrics.write(metrics_path, metrics_format)
+            print(f"✓ Metrics written to {metrics_path}")
+        if profiler:
+            profiler.dump_stats(args.profile)
+            pstats.Stats(profiler).sort_stats("cumulative").print_stats(20)
+            print(f"✓ Profile written to {args.profile}")
 
 
 if __name__ == "__main__":
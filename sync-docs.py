@@ -137,9 +137,11 @@ def create_latest_symlink(latest_version: str):
     docs_dir = Path("_docs")
     latest_link = docs_dir / "latest"
     
-    # Remove existing symlink if it exists
-    if latest_link.is_symlink() or latest_link.exists():
+    # Remove existing symlink if it exists; sync-docs-optimized.py leaves a directory of redirect stubs
+    if latest_link.is_symlink() or latest_link.is_file():
         latest_link.unlink()
+    elif latest_link.is_dir():
+        shutil.rmtree(latest_link)
     
     # Create new symlink
     latest_link.symlink_to(latest_version)